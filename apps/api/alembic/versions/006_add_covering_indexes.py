@@ -0,0 +1,66 @@
+"""add covering indexes for transaction listing and latest balance per asset
+
+Revision ID: 006_add_covering_indexes
+Revises: 005_create_portfolio_snapshots
+Create Date: 2026-10-15 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "006_add_covering_indexes"
+down_revision: Union[str, None] = "005_create_portfolio_snapshots"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE/DROP INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        # Listado paginado: WHERE account_id = ? [AND type/base_asset] ORDER BY executed_at DESC.
+        # INCLUDE (type, base_asset) permite resolver filtros y COUNT(*) con index-only scan.
+        # Sustituye a ix_transactions_account_executed (mismo prefijo, sería redundante).
+        op.create_index(
+            "ix_transactions_account_executed_desc",
+            "transactions",
+            ["account_id", sa.text("executed_at DESC")],
+            postgresql_include=["type", "base_asset"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_transactions_account_executed",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
+
+        # Último snapshot por activo: una búsqueda por índice (account_id, asset)
+        # que devuelve free/locked sin visitar el heap.
+        op.create_index(
+            "ix_balances_snapshot_account_asset_snapshot_at",
+            "balances_snapshot",
+            ["account_id", "asset", sa.text("snapshot_at DESC")],
+            postgresql_include=["free", "locked"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_balances_snapshot_account_asset_snapshot_at",
+            table_name="balances_snapshot",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_transactions_account_executed",
+            "transactions",
+            ["account_id", "executed_at"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_transactions_account_executed_desc",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
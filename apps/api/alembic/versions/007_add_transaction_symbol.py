@@ -0,0 +1,52 @@
+"""add generated symbol column and trade cursor index to transactions
+
+Revision ID: 007_add_transaction_symbol
+Revises: 006_add_covering_indexes
+Create Date: 2026-10-15 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "007_add_transaction_symbol"
+down_revision: Union[str, None] = "006_add_covering_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Par completo materializado desde raw_data (solo trades lo traen)
+    op.add_column(
+        "transactions",
+        sa.Column(
+            "symbol",
+            sa.String(20),
+            sa.Computed("raw_data->>'symbol'", persisted=True),
+            nullable=True,
+        ),
+    )
+
+    # CREATE/DROP INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        # Cursor de sync: MAX(binance_id::bigint) y MIN(executed_at) por par con
+        # index-only scan. Parcial a buy/sell: los binance_id de depósitos no son numéricos.
+        op.create_index(
+            "ix_transactions_trade_cursor",
+            "transactions",
+            ["account_id", "symbol", sa.text("(binance_id::bigint)")],
+            postgresql_include=["executed_at"],
+            postgresql_where=sa.text("type IN ('buy', 'sell')"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_trade_cursor",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("transactions", "symbol")
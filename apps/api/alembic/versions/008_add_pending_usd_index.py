@@ -0,0 +1,39 @@
+"""add partial index for transactions pending USD enrichment
+
+Revision ID: 008_add_pending_usd_index
+Revises: 007_add_transaction_symbol
+Create Date: 2026-10-15 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "008_add_pending_usd_index"
+down_revision: Union[str, None] = "007_add_transaction_symbol"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE/DROP INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        # _enrich_trade_usd_values: solo las filas aún sin total_value_usd (pocas
+        # tras el primer sync), sin recorrer todo el historial de la cuenta.
+        op.create_index(
+            "ix_transactions_account_usd_pending",
+            "transactions",
+            ["account_id"],
+            postgresql_where=sa.text("total_value_usd IS NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_account_usd_pending",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,27 @@
+"""add gen_random_uuid() server defaults to transactions and balances_snapshot ids
+
+Revision ID: 009_add_uuid_server_defaults
+Revises: 008_add_pending_usd_index
+Create Date: 2026-10-15 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "009_add_uuid_server_defaults"
+down_revision: Union[str, None] = "008_add_pending_usd_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # El sync inserta en bloque sin id: PostgreSQL lo genera (nativo desde PG 13)
+    for table in ("transactions", "balances_snapshot"):
+        op.alter_column(table, "id", server_default=sa.text("gen_random_uuid()"))
+
+
+def downgrade() -> None:
+    for table in ("transactions", "balances_snapshot"):
+        op.alter_column(table, "id", server_default=None)
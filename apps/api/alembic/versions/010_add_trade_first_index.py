@@ -0,0 +1,39 @@
+"""add index for the oldest stored trade per symbol
+
+Revision ID: 010_add_trade_first_index
+Revises: 009_add_uuid_server_defaults
+Create Date: 2026-10-15 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "010_add_trade_first_index"
+down_revision: Union[str, None] = "009_add_uuid_server_defaults"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE/DROP INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        # _load_trade_cursors: primer trade de cada par con ORDER BY executed_at
+        # LIMIT 1 (el fromId sale de ix_transactions_trade_cursor).
+        op.create_index(
+            "ix_transactions_trade_first",
+            "transactions",
+            ["account_id", "symbol", "executed_at"],
+            postgresql_where=sa.text("type IN ('buy', 'sell')"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_trade_first",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
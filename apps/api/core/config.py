@@ -59,6 +59,12 @@ class Settings(BaseSettings):
     # URL base de la API de Binance (permite apuntar a testnet en desarrollo)
     BINANCE_API_BASE_URL: str = "https://api.binance.com"
 
+    # Ventanas de 90 días (depósitos/retiros) pedidas en paralelo por sync
+    BINANCE_WINDOW_CONCURRENCY: int = 5
+
+    # Cuentas sincronizadas a la vez por el scheduler (carga agregada sobre Binance)
+    MAX_CONCURRENT_SYNCS: int = 2
+
     # --- Backups -------------------------------------------------------------
     BACKUP_DIR: str = "/backups"
 
@@ -2,16 +2,25 @@
 Configuración del motor SQLAlchemy async y fábrica de sesiones.
 """
 
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from core.config import settings
 
+
+def _json_dumps(value: object) -> str:
+    """Serializador de columnas JSON/JSONB (raw_data, composition_json) con orjson."""
+    return orjson.dumps(value).decode()
+
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.APP_ENV == "development",
     pool_pre_ping=True,   # detecta conexiones muertas
     pool_size=5,
     max_overflow=10,
+    json_serializer=_json_dumps,
+    json_deserializer=orjson.loads,
 )
 
 AsyncSessionLocal = async_sessionmaker(
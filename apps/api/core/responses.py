@@ -2,16 +2,47 @@
 Helpers para la estructura de respuesta estándar { data, error, meta }.
 Todos los endpoints de la API deben usar estas funciones para garantizar
 coherencia en el formato de respuesta.
+
+Serialización: orjson con un hook `default` que convierte Decimal → str.
+Los routers pueden devolver Decimal directamente; el formato en el cable
+sigue siendo string (NUNCA float para datos financieros).
 """
 
+from decimal import Decimal
 from typing import Any
 
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _json_default(obj: Any) -> Any:
+    """Tipos que orjson no serializa de forma nativa."""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Tipo no serializable a JSON: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse serializada con orjson (datetime, UUID y Decimal incluidos)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
 
 def ok(data: Any = None, meta: dict | None = None) -> dict:
     """Respuesta exitosa."""
     return {"data": data, "error": None, "meta": meta or {}}
 
 
+def fast_ok(data: Any = None, meta: dict | None = None) -> ORJSONResponse:
+    """
+    Igual que ok() pero devuelve la respuesta ya construida: FastAPI no valida
+    ni re-serializa el sobre, orjson lo convierte a bytes en una sola pasada.
+    Para endpoints calientes con listas grandes (assets, transactions).
+    """
+    return ORJSONResponse(ok(data, meta))
+
+
 def err(message: str, meta: dict | None = None) -> dict:
     """Respuesta de error (para exception handlers globales)."""
     return {"data": None, "error": message, "meta": meta or {}}
@@ -12,6 +12,7 @@ import base64
 import os
 import secrets
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
@@ -70,23 +71,32 @@ def verify_token(token: str) -> str:
 # ---------------------------------------------------------------------------
 
 
-def _get_aes_key() -> bytes:
+def _get_aes_key(encryption_key: str) -> bytes:
     """Decodifica ENCRYPTION_KEY (base64url → 32 bytes). Falla si la longitud es incorrecta."""
-    key = base64.urlsafe_b64decode(settings.ENCRYPTION_KEY)
+    key = base64.urlsafe_b64decode(encryption_key)
     if len(key) != 32:
         raise ValueError(f"ENCRYPTION_KEY debe ser 32 bytes, tiene {len(key)}")
     return key
 
 
+@lru_cache(maxsize=4)
+def _get_aesgcm(encryption_key: str) -> AESGCM:
+    """
+    Instancia AESGCM cacheada por valor de ENCRYPTION_KEY.
+    Se cachea el cifrador (clave expandida), NUNCA el texto plano descifrado.
+    Indexar por la clave permite rotarla sin reiniciar el proceso.
+    """
+    return AESGCM(_get_aes_key(encryption_key))
+
+
 def encrypt_secret(plaintext: str) -> str:
     """
     Cifra un string con AES-256-GCM.
     Formato del resultado: base64url(nonce[12] || ciphertext+tag)
     La librería `cryptography` añade el tag (16 bytes) al final del ciphertext.
     """
-    key = _get_aes_key()
+    aesgcm = _get_aesgcm(settings.ENCRYPTION_KEY)
     nonce = os.urandom(_NONCE_BYTES)
-    aesgcm = AESGCM(key)
     ciphertext_with_tag = aesgcm.encrypt(nonce, plaintext.encode("utf-8"), None)
     return base64.urlsafe_b64encode(nonce + ciphertext_with_tag).decode("utf-8")
 
@@ -96,7 +106,7 @@ def decrypt_secret(encrypted: str) -> str:
     Descifra un valor cifrado con encrypt_secret.
     Lanza ValueError si la clave es incorrecta o el dato está corrupto.
     """
-    key = _get_aes_key()
+    aesgcm = _get_aesgcm(settings.ENCRYPTION_KEY)
     try:
         raw = base64.urlsafe_b64decode(encrypted)
     except Exception as exc:
@@ -107,7 +117,6 @@ def decrypt_secret(encrypted: str) -> str:
 
     nonce = raw[:_NONCE_BYTES]
     ciphertext_with_tag = raw[_NONCE_BYTES:]
-    aesgcm = AESGCM(key)
     try:
         return aesgcm.decrypt(nonce, ciphertext_with_tag, None).decode("utf-8")
     except InvalidTag as exc:
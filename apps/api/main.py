@@ -11,7 +11,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from core.config import settings
-from core.responses import err
+from core.responses import ORJSONResponse, err
 from routers import auth, dashboard, fiscal, portfolio, prices
 from routers import settings as settings_router
 from routers import sync, transactions
@@ -33,6 +33,7 @@ app = FastAPI(
     docs_url="/docs" if settings.APP_ENV != "production" else None,
     redoc_url="/redoc" if settings.APP_ENV != "production" else None,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # ---------------------------------------------------------------------------
@@ -18,9 +18,18 @@ class BalanceSnapshot(Base):
 
     __table_args__ = (
         sa.Index("ix_balances_snapshot_account_snapshot_at", "account_id", "snapshot_at"),
+        sa.Index(
+            "ix_balances_snapshot_account_asset_snapshot_at",
+            "account_id",
+            "asset",
+            sa.desc("snapshot_at"),
+            postgresql_include=["free", "locked"],
+        ),
     )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")
+    )
     account_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), sa.ForeignKey("accounts.id"), nullable=False)
     asset: Mapped[str] = mapped_column(sa.String(20), nullable=False)
     # NUMERIC(36,18) para cantidades cripto
@@ -27,11 +27,38 @@ class Transaction(Base):
     __tablename__ = "transactions"
 
     __table_args__ = (
-        sa.Index("ix_transactions_account_executed", "account_id", "executed_at"),
+        sa.Index(
+            "ix_transactions_account_executed_desc",
+            "account_id",
+            sa.desc("executed_at"),
+            postgresql_include=["type", "base_asset"],
+        ),
         sa.Index("ix_transactions_asset_executed", "base_asset", "executed_at"),
+        sa.Index(
+            "ix_transactions_trade_cursor",
+            "account_id",
+            "symbol",
+            sa.text("(binance_id::bigint)"),
+            postgresql_include=["executed_at"],
+            postgresql_where=sa.text("type IN ('buy', 'sell')"),
+        ),
+        sa.Index(
+            "ix_transactions_trade_first",
+            "account_id",
+            "symbol",
+            "executed_at",
+            postgresql_where=sa.text("type IN ('buy', 'sell')"),
+        ),
+        sa.Index(
+            "ix_transactions_account_usd_pending",
+            "account_id",
+            postgresql_where=sa.text("total_value_usd IS NULL"),
+        ),
     )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")
+    )
     account_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), sa.ForeignKey("accounts.id"), nullable=False)
     binance_id: Mapped[str | None] = mapped_column(sa.String(100), unique=True, nullable=True)
     type: Mapped[str] = mapped_column(
@@ -48,6 +75,12 @@ class Transaction(Base):
     fee_amount: Mapped[Decimal | None] = mapped_column(sa.NUMERIC(36, 18), nullable=True)
     executed_at: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False)
     raw_data: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # Par completo (e.g. "BTCUSDT") generado desde raw_data; NULL salvo en trades
+    symbol: Mapped[str | None] = mapped_column(
+        sa.String(20),
+        sa.Computed("raw_data->>'symbol'", persisted=True),
+        nullable=True,
+    )
 
     # Relaciones
     account: Mapped["Account"] = relationship(back_populates="transactions")  # noqa: F821
@@ -213,14 +213,14 @@ def _compute_mas(
     running200 = Decimal("0")
 
     for i, ph in enumerate(price_rows):
-        c = Decimal(str(ph.close))
+        c = ph.close  # NUMERIC → Decimal ya desde el driver
         running50 += c
         running200 += c
 
         if i >= 50:
-            running50 -= Decimal(str(price_rows[i - 50].close))
+            running50 -= price_rows[i - 50].close
         if i >= 200:
-            running200 -= Decimal(str(price_rows[i - 200].close))
+            running200 -= price_rows[i - 200].close
 
         if i >= 49:
             ma50[i] = (running50 / Decimal("50")).quantize(Decimal("0.01"))
@@ -305,7 +305,7 @@ async def get_btc_insights(
 
     # Lookup fecha → precio de cierre para timing analysis
     price_by_date: dict[date, Decimal] = {
-        ph.open_at.date(): Decimal(str(ph.close)) for ph in price_rows
+        ph.open_at.date(): ph.close for ph in price_rows
     }
 
     # MA200 por fecha para contexto de cada compra
@@ -585,7 +585,7 @@ async def get_dca_simulation(
     )
 
     price_by_date: dict[date, Decimal] = {
-        ph.open_at.date(): Decimal(str(ph.close)) for ph in price_rows
+        ph.open_at.date(): ph.close for ph in price_rows
     }
 
     # Generar fechas del DCA simulado
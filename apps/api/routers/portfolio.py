@@ -12,7 +12,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.dependencies import get_account, get_db
-from core.responses import ok
+from core.responses import ORJSONResponse, fast_ok, ok
 from models.account import Account
 from models.balance_snapshot import BalanceSnapshot
 from models.portfolio_snapshot import PortfolioSnapshot
@@ -21,6 +21,15 @@ from services.portfolio_service import PortfolioService
 
 router = APIRouter()
 
+# Sufijos de cotización con su longitud precalculada: BTCUSDT → ("USDT", 4) → BTC
+_QUOTE_SUFFIXES: tuple[tuple[str, int], ...] = (("USDT", 4), ("BUSD", 4), ("USD", 3), ("EUR", 3))
+# Stablecoins valoradas siempre a 1 USD en _get_prices
+_STABLE_PRICES: dict[str, Decimal] = {
+    stable: Decimal("1") for stable in ("USDT", "USDC", "BUSD", "FDUSD", "DAI", "TUSD")
+}
+_LIQUID_ASSETS = frozenset({"USDT", "USDC", "BUSD", "FDUSD", "DAI", "EUR", "USD"})
+_STABLECOINS = frozenset({"USDT", "USDC", "BUSD", "FDUSD", "DAI"})
+
 
 async def _get_prices(db: AsyncSession, account_id) -> dict[str, Decimal]:
     """
@@ -48,15 +57,13 @@ async def _get_prices(db: AsyncSession, account_id) -> dict[str, Decimal]:
     for row in rows:
         # BTCUSDT → BTC, EURUSDT → EUR, etc.
         sym: str = row.symbol
-        for quote in ("USDT", "BUSD", "USD", "EUR"):
+        for quote, quote_len in _QUOTE_SUFFIXES:
             if sym.endswith(quote):
-                asset = sym[: -len(quote)]
-                prices[asset] = Decimal(str(row.close))
+                prices[sym[:-quote_len]] = row.close  # NUMERIC → Decimal nativo del driver
                 break
 
-    # Stablecoins y fiat siempre valen 1 USD
-    for stable in ("USDT", "USDC", "BUSD", "FDUSD", "DAI", "TUSD"):
-        prices.setdefault(stable, Decimal("1"))
+    # Stablecoins y fiat siempre valen 1 USD (sin pisar precios reales de price_history)
+    prices = {**_STABLE_PRICES, **prices}
     # EUR fallback si no hay datos
     prices.setdefault("EUR", Decimal("1.08"))
 
@@ -74,7 +81,7 @@ def _to_eur(usd_value: Decimal, eur_usd: Decimal) -> Decimal:
 async def get_assets(
     db: AsyncSession = Depends(get_db),
     account: Account = Depends(get_account),
-) -> dict:
+) -> ORJSONResponse:
     """
     Lista de activos en cartera con métricas por activo:
     balance, valor USD, precio medio de compra (FIFO), P&L.
@@ -84,30 +91,30 @@ async def get_assets(
     service = PortfolioService(db=db, account_id=account.id)
     metrics = await service.calculate_asset_metrics(current_prices=prices)
 
-    return ok(
+    return fast_ok(
         data=[
             {
                 "asset": m.asset,
-                "quantity": str(m.quantity),
-                "value_usd": str(m.value_usd),
-                "value_eur": str(_to_eur(m.value_usd, eur_usd)),
-                "portfolio_pct": str(m.portfolio_pct),
-                "avg_buy_price_usd": str(m.avg_buy_price_usd),
-                "avg_buy_price_eur": str(m.avg_buy_price_eur),
-                "cost_basis_usd": str(m.cost_basis_usd),
-                "cost_basis_eur": str(m.cost_basis_eur),
-                "pnl_usd": str(m.pnl_usd),
-                "pnl_eur": str(_to_eur(m.pnl_usd, eur_usd)),
-                "pnl_pct": str(m.pnl_pct),
-                "realized_pnl_usd": str(m.realized_pnl_usd),
-                "realized_pnl_eur": str(_to_eur(m.realized_pnl_usd, eur_usd)),
+                "quantity": m.quantity,
+                "value_usd": m.value_usd,
+                "value_eur": _to_eur(m.value_usd, eur_usd),
+                "portfolio_pct": m.portfolio_pct,
+                "avg_buy_price_usd": m.avg_buy_price_usd,
+                "avg_buy_price_eur": m.avg_buy_price_eur,
+                "cost_basis_usd": m.cost_basis_usd,
+                "cost_basis_eur": m.cost_basis_eur,
+                "pnl_usd": m.pnl_usd,
+                "pnl_eur": _to_eur(m.pnl_usd, eur_usd),
+                "pnl_pct": m.pnl_pct,
+                "realized_pnl_usd": m.realized_pnl_usd,
+                "realized_pnl_eur": _to_eur(m.realized_pnl_usd, eur_usd),
             }
             for m in metrics
         ],
         meta={
             "prices_source": "price_history",
             "assets_count": len(metrics),
-            "eur_usd_rate": str(eur_usd),
+            "eur_usd_rate": eur_usd,
         },
     )
 
@@ -121,9 +128,6 @@ async def get_liquid_balance(
     Saldo líquido actual: stablecoins + fiat (EUR, USD) en la cuenta.
     Valor en USD: stablecoins a 1:1, EUR convertido vía precio EURUSDT más reciente.
     """
-    LIQUID_ASSETS = frozenset({"USDT", "USDC", "BUSD", "FDUSD", "DAI", "EUR", "USD"})
-    STABLECOINS   = frozenset({"USDT", "USDC", "BUSD", "FDUSD", "DAI"})
-
     # Precio EUR/USD desde price_history (si existe), sino fallback 1.08
     eur_usd = Decimal("1.08")
     subq = (
@@ -139,29 +143,18 @@ async def get_liquid_balance(
         )
     ).first()
     if row:
-        eur_usd = Decimal(str(row.close))
+        eur_usd = row.close
 
-    # Último snapshot por activo líquido
-    latest_ts_subq = (
-        select(
-            BalanceSnapshot.asset,
-            func.max(BalanceSnapshot.snapshot_at).label("max_ts"),
-        )
-        .where(
-            BalanceSnapshot.account_id == account.id,
-            BalanceSnapshot.asset.in_(LIQUID_ASSETS),
-        )
-        .group_by(BalanceSnapshot.asset)
-        .subquery()
-    )
+    # Último snapshot por activo líquido: DISTINCT ON (asset) sobre el índice
+    # (account_id, asset, snapshot_at DESC) — una búsqueda por activo, sin self-join
     q = (
         select(BalanceSnapshot)
-        .join(
-            latest_ts_subq,
-            (BalanceSnapshot.asset == latest_ts_subq.c.asset)
-            & (BalanceSnapshot.snapshot_at == latest_ts_subq.c.max_ts),
+        .where(
+            BalanceSnapshot.account_id == account.id,
+            BalanceSnapshot.asset.in_(_LIQUID_ASSETS),
         )
-        .where(BalanceSnapshot.account_id == account.id)
+        .distinct(BalanceSnapshot.asset)
+        .order_by(BalanceSnapshot.asset, BalanceSnapshot.snapshot_at.desc())
     )
     snapshots = list((await db.execute(q)).scalars().all())
 
@@ -172,7 +165,7 @@ async def get_liquid_balance(
         qty = snap.free + snap.locked
         if qty <= Decimal("0"):
             continue
-        if snap.asset in STABLECOINS:
+        if snap.asset in _STABLECOINS:
             value_usd = qty
         elif snap.asset in ("EUR", "USD"):
             value_usd = qty * eur_usd if snap.asset == "EUR" else qty
@@ -207,7 +200,7 @@ async def get_history(
     to_date: date | None = Query(None),
     db: AsyncSession = Depends(get_db),
     account: Account = Depends(get_account),
-) -> dict:
+) -> ORJSONResponse:
     """
     Serie temporal diaria de portfolio_snapshots.
     Si from_date / to_date no se especifican, retorna todo el histórico.
@@ -218,14 +211,14 @@ async def get_history(
         to_date=to_date or date.today(),
     )
 
-    return ok(
+    return fast_ok(
         data=[
             {
                 "date": p.snapshot_date.isoformat(),
-                "total_value_usd": str(p.total_value_usd),
-                "invested_usd": str(p.invested_usd),
-                "pnl_usd": str(p.pnl_usd),
-                "pnl_pct": str(p.pnl_pct),
+                "total_value_usd": p.total_value_usd,
+                "invested_usd": p.invested_usd,
+                "pnl_usd": p.pnl_usd,
+                "pnl_pct": p.pnl_pct,
             }
             for p in points
         ],
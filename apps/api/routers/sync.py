@@ -4,7 +4,9 @@ POST /trigger → lanza sincronización inmediata en background
 GET  /status  → estado del último sync
 """
 
+import asyncio
 import uuid
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
@@ -18,49 +20,72 @@ from sync.sync_service import SyncService
 
 router = APIRouter()
 
-# Registro en memoria del último job de sync (suficiente para mono-usuario en Fase 1)
-_last_job: dict = {}
 
+@dataclass(slots=True)
+class JobState:
+    """Estado del último job de sync (suficiente para mono-usuario en Fase 1)."""
 
-async def _run_sync(account_id: uuid.UUID, api_key: str, api_secret: str) -> None:
+    job_id: str | None = None
+    status: str = "idle"
+    started_at: str | None = None
+    finished_at: str | None = None
+    records: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+# Registro en memoria del último job. Toda lectura/escritura pasa por _state_lock
+# para que el check "already_running" y el arranque del job sean atómicos.
+_state = JobState()
+_state_lock = asyncio.Lock()
+
+
+async def _update_state(**changes: object) -> None:
+    """Actualiza campos de _state bajo el lock."""
+    async with _state_lock:
+        for name, value in changes.items():
+            setattr(_state, name, value)
+
+
+async def _run_sync(job_id: str, account_id: uuid.UUID, api_key: str, api_secret: str) -> None:
     """
-    Tarea de fondo: ejecuta la sincronización y actualiza _last_job.
+    Tarea de fondo: ejecuta la sincronización y actualiza _state.
     NOTA: En Fase 1c se reemplazará por el job APScheduler.
     """
     from core.database import AsyncSessionLocal
 
-    _last_job.update(
-        {
-            "job_id": str(account_id),
-            "status": "running",
-            "started_at": datetime.now(timezone.utc).isoformat(),
-            "finished_at": None,
-            "records": 0,
-            "errors": [],
-        }
+    await _update_state(
+        job_id=job_id,
+        status="running",
+        started_at=datetime.now(timezone.utc).isoformat(),
+        finished_at=None,
+        records=0,
+        errors=[],
     )
     try:
         async with AsyncSessionLocal() as db:
             result = await db.get(Account, account_id)
             if result is None:
-                _last_job["status"] = "error"
-                _last_job["errors"] = ["Account not found"]
+                await _update_state(status="error", errors=["Account not found"])
                 return
-            service = SyncService(db=db, account=result, api_key=api_key, api_secret=api_secret)
+            service = SyncService(
+                db=db,
+                account=result,
+                api_key=api_key,
+                api_secret=api_secret,
+                session_factory=AsyncSessionLocal,
+            )
             # Todos los pares BTC relevantes para cubrir el historial completo
             stats = await service.sync_all(
                 symbols=["BTCUSDT", "BTCEUR", "BTCBUSD", "BTCFDUSD"]
             )
-            _last_job.update(
-                {
-                    "status": "idle" if not stats.errors else "error",
-                    "finished_at": stats.finished_at.isoformat() if stats.finished_at else None,
-                    "records": stats.total_records,
-                    "errors": stats.errors,
-                }
+            await _update_state(
+                status="idle" if not stats.errors else "error",
+                finished_at=stats.finished_at.isoformat() if stats.finished_at else None,
+                records=stats.total_records,
+                errors=stats.errors,
             )
     except Exception as exc:
-        _last_job.update({"status": "error", "errors": [str(exc)]})
+        await _update_state(status="error", errors=[str(exc)])
 
 
 @router.post("/trigger")
@@ -79,12 +104,6 @@ async def trigger_sync(
             detail="Configura las API Keys de Binance antes de sincronizar (POST /api/v1/settings).",
         )
 
-    if _last_job.get("status") == "running":
-        return ok(
-            data={"job_id": _last_job.get("job_id"), "status": "already_running"},
-            meta={"message": "Ya hay una sincronización en curso"},
-        )
-
     try:
         api_key = decrypt_secret(account.api_key_encrypted)
         api_secret = decrypt_secret(account.api_secret_encrypted)
@@ -94,9 +113,18 @@ async def trigger_sync(
             detail=f"Error al descifrar las API Keys: {exc}",
         ) from exc
 
-    job_id = str(uuid.uuid4())
-    _last_job["job_id"] = job_id
-    background_tasks.add_task(_run_sync, account.id, api_key, api_secret)
+    # Check-and-set atómico: dos /trigger simultáneos no pueden lanzar dos syncs
+    async with _state_lock:
+        if _state.status == "running":
+            return ok(
+                data={"job_id": _state.job_id, "status": "already_running"},
+                meta={"message": "Ya hay una sincronización en curso"},
+            )
+        job_id = str(uuid.uuid4())
+        _state.job_id = job_id
+        _state.status = "running"
+
+    background_tasks.add_task(_run_sync, job_id, account.id, api_key, api_secret)
 
     return ok(
         data={"job_id": job_id, "status": "triggered"},
@@ -109,10 +137,12 @@ async def get_sync_status(
     account: Account = Depends(get_account),
 ) -> dict:
     """Estado del último sync: tomado del modelo Account + último job en memoria."""
+    async with _state_lock:
+        last_job = asdict(_state) if _state.job_id is not None else None
     return ok(
         data={
             "sync_status": account.sync_status,
             "last_sync_at": account.last_sync_at.isoformat() if account.last_sync_at else None,
-            "last_job": _last_job or None,
+            "last_job": last_job,
         }
     )
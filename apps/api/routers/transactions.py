@@ -10,16 +10,32 @@ from datetime import date
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy import func, select
+from sqlalchemy import Row, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.dependencies import get_account, get_db
-from core.responses import ok
+from core.responses import ORJSONResponse, fast_ok
 from models.account import Account
 from models.transaction import Transaction, TRANSACTION_TYPES
 
 router = APIRouter()
 
+# Columnas que devuelven el listado y el CSV. Se seleccionan explícitamente en
+# lugar de select(Transaction) para no hidratar objetos ORM ni traer raw_data (JSONB).
+_LIST_COLUMNS = (
+    Transaction.id,
+    Transaction.binance_id,
+    Transaction.type,
+    Transaction.base_asset,
+    Transaction.quote_asset,
+    Transaction.quantity,
+    Transaction.price,
+    Transaction.total_value_usd,
+    Transaction.fee_asset,
+    Transaction.fee_amount,
+    Transaction.executed_at,
+)
+
 
 def _apply_filters(query, account_id, tx_type, asset, from_date, to_date):
     """Aplica filtros comunes a la query de transactions."""
@@ -45,7 +61,7 @@ async def list_transactions(
     to_date: date | None = Query(None),
     db: AsyncSession = Depends(get_db),
     account: Account = Depends(get_account),
-) -> dict:
+) -> ORJSONResponse:
     """
     Historial paginado de transacciones con filtros opcionales.
     meta incluye: page, limit, total, pages.
@@ -61,13 +77,13 @@ async def list_transactions(
 
     # Datos paginados
     data_q = _apply_filters(
-        select(Transaction),
+        select(*_LIST_COLUMNS),
         account.id, type, asset, from_date, to_date,
     ).order_by(Transaction.executed_at.desc()).offset(offset).limit(limit)
 
-    rows = (await db.execute(data_q)).scalars().all()
+    rows = (await db.execute(data_q)).all()
 
-    return ok(
+    return fast_ok(
         data=[_tx_to_dict(tx) for tx in rows],
         meta={
             "page": page,
@@ -92,11 +108,11 @@ async def export_transactions(
     El payload raw de Binance (raw_data) se excluye del CSV.
     """
     data_q = _apply_filters(
-        select(Transaction),
+        select(*_LIST_COLUMNS),
         account.id, type, asset, from_date, to_date,
     ).order_by(Transaction.executed_at.desc())
 
-    rows = (await db.execute(data_q)).scalars().all()
+    rows = (await db.execute(data_q)).all()
 
     output = io.StringIO()
     writer = csv.writer(output)
@@ -124,17 +140,18 @@ async def export_transactions(
     )
 
 
-def _tx_to_dict(tx: Transaction) -> dict:
+def _tx_to_dict(tx: Row) -> dict:
+    """Fila de _LIST_COLUMNS → dict de respuesta (Decimal/UUID/datetime los serializa orjson)."""
     return {
-        "id": str(tx.id),
+        "id": tx.id,
         "binance_id": tx.binance_id,
         "type": tx.type,
         "base_asset": tx.base_asset,
         "quote_asset": tx.quote_asset,
-        "quantity": str(tx.quantity),
-        "price": str(tx.price) if tx.price else None,
-        "total_value_usd": str(tx.total_value_usd) if tx.total_value_usd else None,
+        "quantity": tx.quantity,
+        "price": tx.price if tx.price else None,
+        "total_value_usd": tx.total_value_usd if tx.total_value_usd else None,
         "fee_asset": tx.fee_asset,
-        "fee_amount": str(tx.fee_amount) if tx.fee_amount else None,
-        "executed_at": tx.executed_at.isoformat(),
+        "fee_amount": tx.fee_amount if tx.fee_amount else None,
+        "executed_at": tx.executed_at,
     }
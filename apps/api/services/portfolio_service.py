@@ -9,14 +9,19 @@ Reglas críticas (skill financial-calcs):
 - XIRR: Newton-Raphson puro, sin numpy; float solo en el algoritmo iterativo (no en datos)
 """
 
+import time
 import uuid
-from collections import deque
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Container, Iterable
 from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
 from decimal import ROUND_HALF_UP, Decimal
+from itertools import accumulate, groupby
+from operator import attrgetter, mul
 
 import structlog
-from sqlalchemy import select, func, distinct
+from sqlalchemy import Row, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.balance_snapshot import BalanceSnapshot
@@ -36,6 +41,28 @@ FIAT_AND_STABLECOINS = frozenset(
 BUY_TYPES = frozenset({"buy", "deposit", "earn_interest", "staking_reward"})
 SELL_TYPES = frozenset({"sell", "withdrawal"})
 
+# Código entero por tipo de transacción: un único lookup por fila al separar
+# compras y ventas (cualquier otro tipo → sin código, se ignora)
+SIDE_BUY = 0
+SIDE_SELL = 1
+TYPE_SIDE: dict[str, int] = {
+    **{t: SIDE_BUY for t in BUY_TYPES},
+    **{t: SIDE_SELL for t in SELL_TYPES},
+}
+
+# Singletons Decimal reutilizados en los bucles (evita re-parsear el literal)
+ZERO = Decimal("0")
+HUNDRED = Decimal("100")
+DEFAULT_EUR_USD = Decimal("1.08")  # fallback si no hay precio EUR disponible
+
+# Filas por lote al leer transacciones con cursor de servidor
+STREAM_BATCH_SIZE = 1000
+
+# Memo LRU en proceso de resultados FIFO (ver PortfolioService._fifo_cached)
+FIFO_CACHE_TTL_SECONDS = 60.0
+FIFO_CACHE_MAX_ENTRIES = 256
+_fifo_cache: OrderedDict[tuple, tuple[float, "FIFOResult"]] = OrderedDict()
+
 # Precisiones de redondeo
 PRICE_PRECISION = Decimal("0.00000001")   # 8 decimales para precios
 QTY_PRECISION = Decimal("0.000000000000000001")  # 18 dec para cantidades
@@ -143,36 +170,97 @@ class DrawdownResult:
 # ---------------------------------------------------------------------------
 
 
+def _q(value: Decimal, precision: Decimal = PRICE_PRECISION) -> Decimal:
+    """Redondeo final (ROUND_HALF_UP) de un campo visible; los acumuladores no se redondean."""
+    return value.quantize(precision, ROUND_HALF_UP)
+
+
 def _usd_unit_cost(tx: "Transaction") -> Decimal:
     """
     Precio unitario en USD para FIFO.
     Prioridad: total_value_usd / quantity (convierte EUR→USD si fue rellenado).
     Fallback: tx.price (solo correcto si quote_asset es USD/stablecoin).
     """
-    if tx.total_value_usd is not None and tx.quantity > Decimal("0"):
+    if tx.total_value_usd is not None and tx.quantity > ZERO:
         return (tx.total_value_usd / tx.quantity).quantize(PRICE_PRECISION, ROUND_HALF_UP)
-    return tx.price if tx.price is not None else Decimal("0")
+    return tx.price if tx.price is not None else ZERO
 
 
-def _eur_unit_cost(tx: "Transaction", eur_usd: Decimal) -> Decimal:
+def _eur_unit_cost(
+    tx: "Transaction",
+    eur_usd: Decimal,
+    usd_cost: Decimal | None = None,
+) -> Decimal:
     """
     Precio unitario en EUR histórico.
     - Trades BTCEUR: tx.price ya está en EUR — se usa directamente (exacto).
     - Trades BTCUSDT: se convierte el precio USD con el tipo de cambio actual
       (mejor aproximación posible sin almacenar el tipo histórico por transacción).
+    usd_cost: _usd_unit_cost(tx) si el llamador ya lo tiene calculado.
     """
     if tx.quote_asset == "EUR":
-        return tx.price if tx.price is not None else Decimal("0")
-    usd_cost = _usd_unit_cost(tx)
-    if eur_usd <= Decimal("0"):
-        return Decimal("0")
+        return tx.price if tx.price is not None else ZERO
+    if usd_cost is None:
+        usd_cost = _usd_unit_cost(tx)
+    if eur_usd <= ZERO:
+        return ZERO
     return (usd_cost / eur_usd).quantize(PRICE_PRECISION, ROUND_HALF_UP)
 
 
+def _fifo_kernel(
+    buy_qty: list[Decimal],
+    buy_cost: list[Decimal],
+    sell_qty: list[Decimal],
+    sell_price: list[Decimal],
+) -> tuple[int, Decimal, Decimal]:
+    """
+    Consume los lots de compra mediante sumas prefijas de cantidad y coste.
+    Cada venta localiza con bisect el lot donde termina (O(log B)) y su P&L
+    es precio * cantidad - (coste acumulado hasta el final - hasta el inicio),
+    sin recorrer uno a uno los lots que consume.
+    Retorna (índice del primer lot vivo, cantidad restante de ese lot, P&L realizado).
+    Si head == len(buy_qty) no quedan lots.
+    """
+    n = len(buy_qty)
+    if n == 0:
+        return 0, ZERO, ZERO
+
+    cum_qty = [ZERO, *accumulate(buy_qty)]
+    cum_cost = [ZERO, *accumulate(map(mul, buy_qty, buy_cost))]
+    total_qty = cum_qty[-1]
+
+    def cost_at(position: Decimal) -> Decimal:
+        """Coste acumulado de las primeras `position` unidades compradas."""
+        i = min(bisect_right(cum_qty, position) - 1, n - 1)
+        return cum_cost[i] + (position - cum_qty[i]) * buy_cost[i]
+
+    consumed = ZERO
+    consumed_cost = ZERO
+    realized_pnl = ZERO
+
+    for qty_to_sell, price in zip(sell_qty, sell_price):
+        if consumed >= total_qty:
+            break  # venta sin lots disponibles (data gap): se ignora el exceso
+        if qty_to_sell <= ZERO:
+            continue
+        target = min(consumed + qty_to_sell, total_qty)
+        target_cost = cost_at(target)
+        realized_pnl += price * (target - consumed) - (target_cost - consumed_cost)
+        consumed, consumed_cost = target, target_cost
+
+    if consumed == ZERO:
+        return 0, buy_qty[0], realized_pnl
+
+    head = min(bisect_right(cum_qty, consumed) - 1, n)
+    head_qty = cum_qty[head + 1] - consumed if head < n else ZERO
+    return head, head_qty, realized_pnl
+
+
 def compute_fifo(
     buys: list["Transaction"],
     sells: list["Transaction"],
-    eur_usd: Decimal = Decimal("1.08"),
+    eur_usd: Decimal = DEFAULT_EUR_USD,
+    buy_costs: list[Decimal] | None = None,
 ) -> FIFOResult:
     """
     Computa el coste base (FIFO) y el P&L realizado.
@@ -180,81 +268,78 @@ def compute_fifo(
     buys:  transacciones buy/deposit ordenadas por executed_at ASC
     sells: transacciones sell/withdrawal ordenadas por executed_at ASC
     eur_usd: tipo de cambio EUR/USD actual (usado para trades BTCUSDT).
+    buy_costs: _usd_unit_cost() de cada buy, si el llamador ya los calculó.
 
     unit_cost en USD: usa total_value_usd/qty (histórico, correcto para BTCEUR).
     unit_cost_eur: tx.price para BTCEUR (exacto); USD/eur_usd para BTCUSDT (aproximado).
     Los lots se consumen de más antiguo a más nuevo. Si una venta supera
     los lots disponibles (data gap), se ignora el exceso.
     """
-    lots: deque[FIFOLot] = deque(
-        FIFOLot(
-            quantity=tx.quantity,
-            unit_cost=_usd_unit_cost(tx),
-            unit_cost_eur=_eur_unit_cost(tx, eur_usd),
+    # Listas paralelas (SoA): cantidades y costes unitarios por lot
+    buy_qty = [tx.quantity for tx in buys]
+    buy_cost = buy_costs if buy_costs is not None else [_usd_unit_cost(tx) for tx in buys]
+    sell_qty = [tx.quantity for tx in sells]
+    sell_price = [
+        _usd_unit_cost(tx) if tx.total_value_usd is not None else (
+            tx.price if tx.price is not None else ZERO
         )
-        for tx in buys
-    )
-
-    realized_pnl = Decimal("0")
-
-    for sell in sells:
-        qty_to_sell = sell.quantity
-        sell_price = _usd_unit_cost(sell) if sell.total_value_usd is not None else (
-            sell.price if sell.price is not None else Decimal("0")
+        for tx in sells
+    ]
+
+    head, head_qty, realized_pnl = _fifo_kernel(buy_qty, buy_cost, sell_qty, sell_price)
+
+    # Solo se materializan (y se calcula el coste EUR de) los lots supervivientes
+    remaining: list[FIFOLot] = []
+    for i in range(head, len(buys)):
+        remaining.append(
+            FIFOLot(
+                quantity=head_qty if i == head else buy_qty[i],
+                unit_cost=buy_cost[i],
+                unit_cost_eur=_eur_unit_cost(buys[i], eur_usd, buy_cost[i]),
+            )
         )
 
-        while qty_to_sell > Decimal("0") and lots:
-            lot = lots[0]
-            if lot.quantity <= qty_to_sell:
-                realized_pnl += (sell_price - lot.unit_cost) * lot.quantity
-                qty_to_sell -= lot.quantity
-                lots.popleft()
-            else:
-                realized_pnl += (sell_price - lot.unit_cost) * qty_to_sell
-                # Lot parcialmente consumido — preservar unit_cost_eur del lot original
-                lots[0] = FIFOLot(
-                    quantity=lot.quantity - qty_to_sell,
-                    unit_cost=lot.unit_cost,
-                    unit_cost_eur=lot.unit_cost_eur,
-                )
-                qty_to_sell = Decimal("0")
-
-    remaining = list(lots)
     cost_basis = sum(
         (lot.quantity * lot.unit_cost for lot in remaining),
-        Decimal("0"),
+        ZERO,
     )
     cost_basis_eur = sum(
         (lot.quantity * lot.unit_cost_eur for lot in remaining),
-        Decimal("0"),
+        ZERO,
     )
 
     return FIFOResult(
         remaining_lots=remaining,
-        realized_pnl=realized_pnl.quantize(PRICE_PRECISION, ROUND_HALF_UP),
-        cost_basis=cost_basis.quantize(PRICE_PRECISION, ROUND_HALF_UP),
-        cost_basis_eur=cost_basis_eur.quantize(PRICE_PRECISION, ROUND_HALF_UP),
+        realized_pnl=_q(realized_pnl),
+        cost_basis=_q(cost_basis),
+        cost_basis_eur=_q(cost_basis_eur),
     )
 
 
-def compute_vwap(transactions: list["Transaction"]) -> Decimal:
+def compute_vwap(
+    transactions: list["Transaction"],
+    unit_costs: list[Decimal] | None = None,
+) -> Decimal:
     """
     VWAP en USD = sum(unit_cost_usd_i * qty_i) / sum(qty_i).
-    Usa _usd_unit_cost() para convertir correctamente trades EUR→USD.
+    Usa _usd_unit_cost() para convertir correctamente trades EUR→USD
+    (o unit_costs, si el llamador ya los calculó).
     Ignora transacciones sin coste calculable.
     """
-    total_cost = Decimal("0")
-    total_qty = Decimal("0")
+    if unit_costs is None:
+        unit_costs = [_usd_unit_cost(tx) for tx in transactions]
+    # Una sola pasada: filtra y empareja; los productos y sumas van en bucles C
+    # (map/sum sobre Decimal, exactos: sin escalar a enteros ni pasar por float)
+    priced = [(cost, tx.quantity) for cost, tx in zip(unit_costs, transactions) if cost]
+    if not priced:
+        return ZERO
 
-    for tx in transactions:
-        unit_cost = _usd_unit_cost(tx)
-        if unit_cost == Decimal("0"):
-            continue
-        total_cost += unit_cost * tx.quantity
-        total_qty += tx.quantity
+    costs, qtys = zip(*priced)
+    total_cost = sum(map(mul, costs, qtys), ZERO)
+    total_qty = sum(qtys, ZERO)
 
-    if total_qty == Decimal("0"):
-        return Decimal("0")
+    if total_qty == ZERO:
+        return ZERO
 
     return (total_cost / total_qty).quantize(PRICE_PRECISION, ROUND_HALF_UP)
 
@@ -267,34 +352,35 @@ def compute_drawdown(snapshots: list[PortfolioSnapshot]) -> DrawdownResult:
     """
     if not snapshots:
         return DrawdownResult(
-            max_drawdown_pct=Decimal("0"),
+            max_drawdown_pct=ZERO,
             peak_date=None,
             trough_date=None,
-            peak_value_usd=Decimal("0"),
-            trough_value_usd=Decimal("0"),
+            peak_value_usd=ZERO,
+            trough_value_usd=ZERO,
         )
 
-    running_max = Decimal("0")
-    running_max_snap = snapshots[0]
-
-    worst_drawdown = Decimal("0")
-    worst_peak_snap = snapshots[0]
-    worst_trough_snap = snapshots[0]
-
-    for snap in snapshots:
-        if snap.total_value_usd > running_max:
-            running_max = snap.total_value_usd
-            running_max_snap = snap
-
-        if running_max > Decimal("0"):
-            dd = (snap.total_value_usd - running_max) / running_max
+    # Una sola pasada sin salir de Decimal: máximo acumulado (y su índice) y
+    # peor caída a la vez. Solo se divide cuando el valor queda bajo el pico.
+    peak: Decimal | None = None
+    running_peak_idx = 0
+    worst_drawdown = ZERO
+    trough_idx = 0
+    peak_idx = 0
+    for i, snap in enumerate(snapshots):
+        value = snap.total_value_usd
+        if peak is None or value > peak:
+            # Pico = primera aparición del máximo (> estricto)
+            peak, running_peak_idx = value, i
+        elif value < peak and peak > ZERO:
+            dd = (value - peak) / peak
             if dd < worst_drawdown:
-                worst_drawdown = dd
-                worst_peak_snap = running_max_snap
-                worst_trough_snap = snap
+                worst_drawdown, trough_idx, peak_idx = dd, i, running_peak_idx
+
+    worst_peak_snap = snapshots[peak_idx]
+    worst_trough_snap = snapshots[trough_idx]
 
     return DrawdownResult(
-        max_drawdown_pct=(worst_drawdown * Decimal("100")).quantize(PCT_PRECISION, ROUND_HALF_UP),
+        max_drawdown_pct=(worst_drawdown * HUNDRED).quantize(PCT_PRECISION, ROUND_HALF_UP),
         peak_date=worst_peak_snap.snapshot_date,
         trough_date=worst_trough_snap.snapshot_date,
         peak_value_usd=worst_peak_snap.total_value_usd,
@@ -302,6 +388,78 @@ def compute_drawdown(snapshots: list[PortfolioSnapshot]) -> DrawdownResult:
     )
 
 
+# Tasas muestreadas para acotar la raíz antes de Newton (cubre todo el rango
+# aceptado por compute_xirr: (-100%, +10000%])
+_XIRR_SCAN_RATES = (-0.9999, -0.99, -0.9, -0.5, 0.0, 0.5, 2.0, 10.0, 100.0)
+
+
+def _npv(amounts: list[float], years: list[float], rate: float) -> float:
+    inv = 1.0 / (1.0 + rate)
+    return sum(a * inv**t for a, t in zip(amounts, years))
+
+
+def _xirr_bracket(amounts: list[float], years: list[float]) -> float | None:
+    """
+    Busca un cambio de signo del VPN en _XIRR_SCAN_RATES y lo estrecha con
+    20 pasos de bisección. Retorna el punto medio del intervalo como estimación
+    inicial para Newton, o None si el VPN no cambia de signo (no hay raíz).
+    """
+    prev_rate = _XIRR_SCAN_RATES[0]
+    prev_npv = _npv(amounts, years, prev_rate)
+    if prev_npv == 0.0:
+        return prev_rate
+    for rate in _XIRR_SCAN_RATES[1:]:
+        fn = _npv(amounts, years, rate)
+        if fn == 0.0:
+            return rate
+        if (fn > 0.0) != (prev_npv > 0.0):
+            lo, hi, f_lo = prev_rate, rate, prev_npv
+            for _ in range(20):
+                mid = (lo + hi) / 2.0
+                f_mid = _npv(amounts, years, mid)
+                if (f_mid > 0.0) == (f_lo > 0.0):
+                    lo, f_lo = mid, f_mid
+                else:
+                    hi = mid
+            return (lo + hi) / 2.0
+        prev_rate, prev_npv = rate, fn
+    return None
+
+
+def _xirr_newton(
+    amounts: list[float],
+    years: list[float],
+    guess: float,
+    max_iter: int,
+    tol: float,
+) -> float | None:
+    """
+    Newton-Raphson sobre el VPN. VPN y derivada se calculan en un único
+    bucle fusionado por iteración: 1/(1+r) se evalúa una vez y cada término
+    (1+r)^-t se reutiliza para la derivada, en lugar de dos sumas con `**`.
+    Retorna None si no converge.
+    """
+    flows = list(zip(amounts, years))
+    rate = guess
+    for _ in range(max_iter):
+        if rate <= -1.0:
+            return None
+        inv = 1.0 / (1.0 + rate)
+        fn = 0.0
+        dfn = 0.0
+        for a, t in flows:
+            p = a * inv**t
+            fn += p
+            dfn -= t * p * inv
+        if abs(dfn) < 1e-12:
+            return None
+        step = fn / dfn
+        rate -= step
+        if abs(step) < tol:
+            return rate
+    return None
+
+
 def compute_xirr(cash_flows: list[tuple[date, Decimal]]) -> Decimal | None:
     """
     Tasa Interna de Retorno para flujos de caja irregulares (XIRR).
@@ -321,30 +479,18 @@ def compute_xirr(cash_flows: list[tuple[date, Decimal]]) -> Decimal | None:
     dates = [cf[0] for cf in cash_flows]
     # float solo para el cálculo iterativo numérico
     amounts = [float(cf[1]) for cf in cash_flows]
+    # Sin flujos de ambos signos el VPN no cruza cero: no hay TIR que buscar
+    if not (any(a < 0.0 for a in amounts) and any(a > 0.0 for a in amounts)):
+        return None
     t0 = dates[0]
     years = [(d - t0).days / 365.25 for d in dates]
 
-    def npv(rate: float) -> float:
-        if rate <= -1.0:
-            return float("inf")
-        return sum(a / (1.0 + rate) ** t for a, t in zip(amounts, years))
-
-    def d_npv(rate: float) -> float:
-        if rate <= -1.0:
-            return float("inf")
-        return sum(-t * a / (1.0 + rate) ** (t + 1.0) for a, t in zip(amounts, years))
+    guess = _xirr_bracket(amounts, years)
+    if guess is None:
+        return None  # el VPN no cambia de signo: no existe TIR
 
-    rate = 0.1  # estimación inicial: 10% anual
-    for _ in range(200):
-        fn = npv(rate)
-        dfn = d_npv(rate)
-        if abs(dfn) < 1e-12:
-            return None
-        step = fn / dfn
-        rate -= step
-        if abs(step) < 1e-10:
-            break
-    else:
+    rate = _xirr_newton(amounts, years, guess=guess, max_iter=200, tol=1e-10)
+    if rate is None:
         return None  # no converge
 
     if rate <= -1.0 or rate > 100.0:
@@ -353,6 +499,19 @@ def compute_xirr(cash_flows: list[tuple[date, Decimal]]) -> Decimal | None:
     return Decimal(str(round(rate * 100.0, 4)))
 
 
+async def _group_by_asset(
+    txns: list["Transaction"],
+) -> AsyncIterator[tuple[str, Iterable["Transaction"]]]:
+    """
+    Agrupa transacciones ya cargadas por base_asset con la misma interfaz que
+    PortfolioService._stream_asset_groups. sorted es estable: conserva el orden
+    por executed_at dentro de cada activo.
+    """
+    by_asset = attrgetter("base_asset")
+    for asset, group in groupby(sorted(txns, key=by_asset), key=by_asset):
+        yield asset, group
+
+
 # ---------------------------------------------------------------------------
 # Servicio con acceso a base de datos
 # ---------------------------------------------------------------------------
@@ -370,67 +529,141 @@ class PortfolioService:
     def __init__(self, db: AsyncSession, account_id: uuid.UUID) -> None:
         self.db = db
         self.account_id = account_id
+        # Transacciones BTC para la historia sintética: se leen una vez por
+        # instancia (performance + drawdown en la misma petición las comparten)
+        self._btc_history_txns: list[Row] | None = None
 
     # -----------------------------------------------------------------------
     # Queries auxiliares
     # -----------------------------------------------------------------------
 
     async def _get_transactions(self, asset: str | None = None) -> list[Transaction]:
-        """Todas las transacciones de la cuenta, opcionalmente filtradas por activo."""
-        q = select(Transaction).where(Transaction.account_id == self.account_id)
+        """
+        Todas las transacciones de la cuenta, opcionalmente filtradas por activo.
+        lambda_stmt: la construcción y compilación de la sentencia se cachea por
+        código fuente de la lambda; account_id/asset viajan como bind params.
+        """
+        account_id = self.account_id
+        q = lambda_stmt(lambda: select(Transaction).where(Transaction.account_id == account_id))
         if asset:
-            q = q.where(Transaction.base_asset == asset)
-        q = q.order_by(Transaction.executed_at)
+            q += lambda s: s.where(Transaction.base_asset == asset)
+        q += lambda s: s.order_by(Transaction.executed_at)
         result = await self.db.execute(q)
         return list(result.scalars().all())
 
-    async def _get_latest_balances(self) -> dict[str, Decimal]:
+    async def _stream_asset_groups(
+        self,
+        assets: Container[str],
+    ) -> AsyncIterator[tuple[str, list[Row]]]:
         """
-        Último balance conocido por activo (free + locked).
-        Usa una subquery con MAX(snapshot_at) por asset para compatibilidad
-        con cualquier backend SQLAlchemy (evita DISTINCT ON que es PostgreSQL-only
-        y no es generado correctamente por el ORM).
+        Solo las columnas que necesita el cálculo FIFO por activo, ordenadas por
+        (base_asset, executed_at) y leídas con cursor de servidor (yield_per):
+        en memoria solo vive el lote actual y el grupo del activo en curso.
+        Evita hidratar objetos ORM completos (raw_data JSONB incluido).
+        Las filas de activos fuera de `assets` se descartan sin acumularse.
         """
-        # Subquery: timestamp máximo por asset para esta cuenta
-        latest_ts_subq = (
+        q = (
             select(
-                BalanceSnapshot.asset,
-                func.max(BalanceSnapshot.snapshot_at).label("max_ts"),
+                Transaction.base_asset,
+                Transaction.type,
+                Transaction.quote_asset,
+                Transaction.quantity,
+                Transaction.price,
+                Transaction.total_value_usd,
+                Transaction.executed_at,
             )
-            .where(BalanceSnapshot.account_id == self.account_id)
-            .group_by(BalanceSnapshot.asset)
-            .subquery()
+            .where(Transaction.account_id == self.account_id)
+            .order_by(Transaction.base_asset, Transaction.executed_at)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
         )
-        # Join para traer el registro completo del snapshot más reciente
+        result = await self.db.stream(q)
+
+        current: str | None = None
+        group: list[Row] = []
+        async for row in result:
+            if row.base_asset != current:
+                if group:
+                    yield current, group
+                current, group = row.base_asset, []
+            if current in assets:
+                group.append(row)
+        if group:
+            yield current, group
+
+    async def _get_latest_balances(self) -> dict[str, Decimal]:
+        """
+        Último balance conocido por activo (free + locked).
+        DISTINCT ON (asset) ordenado por snapshot_at DESC: un único recorrido del
+        índice (account_id, asset, snapshot_at DESC) en lugar de GROUP BY + join.
+        """
         q = (
             select(
                 BalanceSnapshot.asset,
                 (BalanceSnapshot.free + BalanceSnapshot.locked).label("total"),
             )
-            .join(
-                latest_ts_subq,
-                (BalanceSnapshot.asset == latest_ts_subq.c.asset)
-                & (BalanceSnapshot.snapshot_at == latest_ts_subq.c.max_ts),
-            )
             .where(BalanceSnapshot.account_id == self.account_id)
+            .distinct(BalanceSnapshot.asset)
+            .order_by(BalanceSnapshot.asset, BalanceSnapshot.snapshot_at.desc())
         )
         result = await self.db.execute(q)
         rows = result.fetchall()
-        return {row.asset: Decimal(str(row.total)) for row in rows if row.total}
+        return {row.asset: row.total for row in rows if row.total}
+
+    def _fifo_cached(
+        self,
+        asset: str,
+        kind: str,
+        buys: list[Transaction],
+        sells: list[Transaction],
+        eur_usd: Decimal,
+        buy_costs: list[Decimal] | None = None,
+    ) -> FIFOResult:
+        """
+        compute_fifo() memoizado en proceso durante FIFO_CACHE_TTL_SECONDS.
+        La clave incluye nº de compras/ventas y executed_at de la última
+        transacción (una sincronización que inserta filas la invalida sola) y
+        cuántas tienen total_value_usd: el enriquecimiento posterior al commit
+        de los trades rellena ese valor en filas ya existentes.
+        kind distingue conjuntos de compras distintos (métricas vs DCA).
+        Al llenarse se expulsa la entrada usada hace más tiempo (LRU).
+        """
+        last_tx = max(
+            (t.executed_at for t in (*buys[-1:], *sells[-1:])),
+            default=None,
+        )
+        priced = sum(t.total_value_usd is not None for t in buys) + sum(
+            t.total_value_usd is not None for t in sells
+        )
+        key = (
+            self.account_id, asset, kind, eur_usd, len(buys), len(sells), last_tx, priced
+        )
+        now = time.monotonic()
+        hit = _fifo_cache.get(key)
+        if hit is not None and hit[0] > now:
+            _fifo_cache.move_to_end(key)
+            return hit[1]
+
+        result = compute_fifo(buys, sells, eur_usd=eur_usd, buy_costs=buy_costs)
+        _fifo_cache[key] = (now + FIFO_CACHE_TTL_SECONDS, result)
+        _fifo_cache.move_to_end(key)
+        if len(_fifo_cache) > FIFO_CACHE_MAX_ENTRIES:
+            _fifo_cache.popitem(last=False)
+        return result
 
     async def _get_portfolio_snapshots(
         self,
         from_date: date | None = None,
         to_date: date | None = None,
     ) -> list[PortfolioSnapshot]:
-        q = select(PortfolioSnapshot).where(
-            PortfolioSnapshot.account_id == self.account_id
+        account_id = self.account_id
+        q = lambda_stmt(
+            lambda: select(PortfolioSnapshot).where(PortfolioSnapshot.account_id == account_id)
         )
         if from_date:
-            q = q.where(PortfolioSnapshot.snapshot_date >= from_date)
+            q += lambda s: s.where(PortfolioSnapshot.snapshot_date >= from_date)
         if to_date:
-            q = q.where(PortfolioSnapshot.snapshot_date <= to_date)
-        q = q.order_by(PortfolioSnapshot.snapshot_date)
+            q += lambda s: s.where(PortfolioSnapshot.snapshot_date <= to_date)
+        q += lambda s: s.order_by(PortfolioSnapshot.snapshot_date)
         result = await self.db.execute(q)
         return list(result.scalars().all())
 
@@ -440,10 +673,18 @@ class PortfolioService:
 
     @staticmethod
     def _split_buys_sells(
-        txns: list[Transaction],
+        txns: Iterable[Transaction],
     ) -> tuple[list[Transaction], list[Transaction]]:
-        buys = [t for t in txns if t.type in BUY_TYPES]
-        sells = [t for t in txns if t.type in SELL_TYPES]
+        """Separa compras y ventas en una sola pasada (acepta el grupo de groupby)."""
+        buys: list[Transaction] = []
+        sells: list[Transaction] = []
+        side_of = TYPE_SIDE.get
+        for t in txns:
+            side = side_of(t.type)
+            if side == SIDE_BUY:
+                buys.append(t)
+            elif side == SIDE_SELL:
+                sells.append(t)
         return buys, sells
 
     @staticmethod
@@ -454,16 +695,16 @@ class PortfolioService:
         Usa total_value_usd si está disponible; si no, price * quantity.
         Las ventas no reducen el capital invertido (métrica de capital total desplegado).
         """
-        invested = Decimal("0")
+        invested = ZERO
         for tx in txns:
             if tx.type in ("deposit", "buy"):
                 val = tx.total_value_usd or (
-                    (tx.price * tx.quantity) if tx.price else Decimal("0")
+                    (tx.price * tx.quantity) if tx.price else ZERO
                 )
                 invested += val
             elif tx.type == "withdrawal" and tx.base_asset in FIAT_AND_STABLECOINS:
                 val = tx.total_value_usd or (
-                    (tx.price * tx.quantity) if tx.price else Decimal("0")
+                    (tx.price * tx.quantity) if tx.price else ZERO
                 )
                 invested -= val
         return invested.quantize(PRICE_PRECISION, ROUND_HALF_UP)
@@ -474,11 +715,11 @@ class PortfolioService:
         Capital bruto desplegado = sum(total_value_usd de buy/deposit)
         SIN descontar retiros fiat. Representa el dinero total enviado a Binance.
         """
-        total = Decimal("0")
+        total = ZERO
         for tx in txns:
             if tx.type in ("deposit", "buy"):
                 val = tx.total_value_usd or (
-                    (tx.price * tx.quantity) if tx.price else Decimal("0")
+                    (tx.price * tx.quantity) if tx.price else ZERO
                 )
                 total += val
         return total.quantize(PRICE_PRECISION, ROUND_HALF_UP)
@@ -497,19 +738,19 @@ class PortfolioService:
         - Retiros fiat EUR → resta price × quantity
         - Retiros fiat USD → resta total_value_usd / eur_usd
         """
-        invested = Decimal("0")
+        invested = ZERO
         for tx in txns:
             if tx.type in ("deposit", "buy"):
                 if tx.quote_asset == "EUR" and tx.price is not None:
                     invested += tx.price * tx.quantity
-                elif tx.total_value_usd is not None and eur_usd > Decimal("0"):
+                elif tx.total_value_usd is not None and eur_usd > ZERO:
                     invested += tx.total_value_usd / eur_usd
                 elif tx.price is not None:
                     invested += tx.price * tx.quantity  # fallback
             elif tx.type == "withdrawal" and tx.base_asset in FIAT_AND_STABLECOINS:
                 if tx.base_asset == "EUR" and tx.price is not None:
                     invested -= tx.price * tx.quantity
-                elif tx.total_value_usd is not None and eur_usd > Decimal("0"):
+                elif tx.total_value_usd is not None and eur_usd > ZERO:
                     invested -= tx.total_value_usd / eur_usd
         return invested.quantize(PRICE_PRECISION, ROUND_HALF_UP)
 
@@ -519,12 +760,12 @@ class PortfolioService:
         Total bruto aportado en EUR, sin descontar retiros.
         Misma lógica que _compute_invested_eur pero sin la resta de retiros fiat.
         """
-        total = Decimal("0")
+        total = ZERO
         for tx in txns:
             if tx.type in ("deposit", "buy"):
                 if tx.quote_asset == "EUR" and tx.price is not None:
                     total += tx.price * tx.quantity
-                elif tx.total_value_usd is not None and eur_usd > Decimal("0"):
+                elif tx.total_value_usd is not None and eur_usd > ZERO:
                     total += tx.total_value_usd / eur_usd
                 elif tx.price is not None:
                     total += tx.price * tx.quantity
@@ -542,20 +783,20 @@ class PortfolioService:
         - Otros activos (BNB, BTC…): × precio actual disponible en prices
         """
         USD_STABLES = frozenset({"USDT", "USD", "FDUSD", "BUSD", "USDC", "DAI", "TUSD", "USDP"})
-        eur_usd = prices.get("EUR", Decimal("1.08"))
-        total = Decimal("0")
+        eur_usd = prices.get("EUR", DEFAULT_EUR_USD)
+        total = ZERO
         for tx in txns:
             if not tx.fee_amount or not tx.fee_asset:
                 continue
-            if tx.fee_amount <= Decimal("0"):
+            if tx.fee_amount <= ZERO:
                 continue
             if tx.fee_asset in USD_STABLES:
                 total += tx.fee_amount
             elif tx.fee_asset == "EUR":
                 total += tx.fee_amount * eur_usd
             else:
-                price = prices.get(tx.fee_asset, Decimal("0"))
-                if price > Decimal("0"):
+                price = prices.get(tx.fee_asset, ZERO)
+                if price > ZERO:
                     total += tx.fee_amount * price
         return total.quantize(PRICE_PRECISION, ROUND_HALF_UP)
 
@@ -566,52 +807,54 @@ class PortfolioService:
     async def calculate_asset_metrics(
         self,
         current_prices: dict[str, Decimal],
+        all_txns: list[Transaction] | None = None,
+        balances: dict[str, Decimal] | None = None,
     ) -> list[AssetMetrics]:
         """
         Métricas por activo: balance, valor USD, coste base FIFO, P&L.
         current_prices: {asset: price_usd}
+        all_txns / balances: si el llamador ya los cargó (p. ej. calculate_overview)
+        se reutilizan en lugar de volver a consultar la BD.
         """
-        all_txns = await self._get_transactions()
-        balances = await self._get_latest_balances()
-        eur_usd = current_prices.get("EUR", Decimal("1.08"))
-
-        # Agrupar transacciones por activo
-        by_asset: dict[str, list[Transaction]] = {}
-        for tx in all_txns:
-            by_asset.setdefault(tx.base_asset, []).append(tx)
+        # Balances antes de abrir el stream: la sesión no admite otra consulta
+        # mientras el cursor de servidor está abierto
+        if balances is None:
+            balances = await self._get_latest_balances()
+        eur_usd = current_prices.get("EUR", DEFAULT_EUR_USD)
+
+        if all_txns is None:
+            groups = self._stream_asset_groups(balances)
+        else:
+            groups = _group_by_asset(all_txns)
 
-        total_value = Decimal("0")
+        total_value = ZERO
         metrics: list[AssetMetrics] = []
 
-        for asset, txns in by_asset.items():
-            price = current_prices.get(asset, Decimal("0"))
-            quantity = balances.get(asset, Decimal("0"))
-
-            if quantity == Decimal("0"):
-                continue  # activo sin balance actual
+        async for asset, group in groups:
+            quantity = balances.get(asset, ZERO)
+            if not quantity:
+                continue  # activo sin balance actual: el grupo se descarta
 
-            buys, sells = self._split_buys_sells(txns)
-            fifo = compute_fifo(buys, sells, eur_usd=eur_usd)
+            price = current_prices.get(asset, ZERO)
+            buys, sells = self._split_buys_sells(group)
+            fifo = self._fifo_cached(asset, "metrics", buys, sells, eur_usd)
 
-            value_usd = (quantity * price).quantize(PRICE_PRECISION, ROUND_HALF_UP)
+            value_usd = _q(quantity * price)
             total_value += value_usd
 
+            # value_usd y cost_basis ya tienen 8 decimales: la resta es exacta
             cost_basis = fifo.cost_basis
-            pnl_usd = (value_usd - cost_basis).quantize(PRICE_PRECISION, ROUND_HALF_UP)
+            pnl_usd = value_usd - cost_basis
             pnl_pct = (
-                (pnl_usd / cost_basis * Decimal("100")).quantize(PCT_PRECISION, ROUND_HALF_UP)
-                if cost_basis > Decimal("0")
-                else Decimal("0")
+                _q(pnl_usd / cost_basis * HUNDRED, PCT_PRECISION)
+                if cost_basis > ZERO
+                else ZERO
             )
             avg_buy_price_usd = (
-                (cost_basis / quantity).quantize(PRICE_PRECISION, ROUND_HALF_UP)
-                if quantity > Decimal("0")
-                else Decimal("0")
+                _q(cost_basis / quantity) if quantity > ZERO else ZERO
             )
             avg_buy_price_eur = (
-                (fifo.cost_basis_eur / quantity).quantize(PRICE_PRECISION, ROUND_HALF_UP)
-                if quantity > Decimal("0")
-                else Decimal("0")
+                _q(fifo.cost_basis_eur / quantity) if quantity > ZERO else ZERO
             )
 
             metrics.append(
@@ -619,7 +862,7 @@ class PortfolioService:
                     asset=asset,
                     quantity=quantity,
                     value_usd=value_usd,
-                    portfolio_pct=Decimal("0"),  # se rellena abajo
+                    portfolio_pct=ZERO,  # se rellena abajo
                     avg_buy_price_usd=avg_buy_price_usd,
                     avg_buy_price_eur=avg_buy_price_eur,
                     cost_basis_usd=cost_basis,
@@ -631,10 +874,10 @@ class PortfolioService:
             )
 
         # Calcular portfolio_pct una vez que tenemos el total
-        if total_value > Decimal("0"):
+        if total_value > ZERO:
             for m in metrics:
                 m.portfolio_pct = (
-                    m.value_usd / total_value * Decimal("100")
+                    m.value_usd / total_value * HUNDRED
                 ).quantize(PCT_PRECISION, ROUND_HALF_UP)
 
         return sorted(metrics, key=lambda m: m.value_usd, reverse=True)
@@ -652,56 +895,57 @@ class PortfolioService:
         - roi_pct: (total_value - invested) / invested * 100
         - irr_annual_pct: XIRR de los flujos de caja
         """
+        # Una sola lectura de transacciones, compartida con las métricas por activo.
+        # Las consultas van en serie: una AsyncSession no admite sentencias concurrentes.
         all_txns = await self._get_transactions()
-        asset_metrics = await self.calculate_asset_metrics(current_prices)
+        asset_metrics = await self.calculate_asset_metrics(current_prices, all_txns=all_txns)
 
-        total_value_usd = sum((m.value_usd for m in asset_metrics), Decimal("0"))
-        total_cost_basis = sum((m.cost_basis_usd for m in asset_metrics), Decimal("0"))
-        total_realized = sum((m.realized_pnl_usd for m in asset_metrics), Decimal("0"))
+        total_value_usd = sum((m.value_usd for m in asset_metrics), ZERO)
+        total_cost_basis = sum((m.cost_basis_usd for m in asset_metrics), ZERO)
+        total_realized = sum((m.realized_pnl_usd for m in asset_metrics), ZERO)
         pnl_unrealized = (total_value_usd - total_cost_basis).quantize(
             PRICE_PRECISION, ROUND_HALF_UP
         )
 
-        eur_usd = current_prices.get("EUR", Decimal("1.08"))
+        eur_usd = current_prices.get("EUR", DEFAULT_EUR_USD)
         invested_usd = self._compute_invested(all_txns)
         invested_eur = self._compute_invested_eur(all_txns, eur_usd)
         fees_usd = self._compute_fees_usd(all_txns, current_prices)
         gross_invested_usd = self._compute_gross_invested(all_txns)
         gross_invested_eur = self._compute_gross_invested_eur(all_txns, eur_usd)
-        total_deposited_usd = (gross_invested_usd + fees_usd).quantize(
-            PRICE_PRECISION, ROUND_HALF_UP
-        )
+        total_deposited_usd = gross_invested_usd + fees_usd  # ambos ya redondeados
         total_deposited_eur = (
-            gross_invested_eur + (fees_usd / eur_usd if eur_usd > Decimal("0") else Decimal("0"))
+            gross_invested_eur + (fees_usd / eur_usd if eur_usd > ZERO else ZERO)
         ).quantize(PRICE_PRECISION, ROUND_HALF_UP)
 
         roi_pct = (
-            ((total_value_usd - invested_usd) / invested_usd * Decimal("100")).quantize(
+            ((total_value_usd - invested_usd) / invested_usd * HUNDRED).quantize(
                 PCT_PRECISION, ROUND_HALF_UP
             )
-            if invested_usd > Decimal("0")
-            else Decimal("0")
+            if invested_usd > ZERO
+            else ZERO
         )
 
         # Construir flujos de caja para XIRR
         # buy/deposit = dinero saliendo del bolsillo (negativo)
         # sell/withdrawal fiat = dinero entrando de vuelta (positivo)
+        # all_txns ya viene ORDER BY executed_at desde _get_transactions()
         cash_flows: list[tuple[date, Decimal]] = []
-        for tx in sorted(all_txns, key=lambda t: t.executed_at):
+        for tx in all_txns:
             if tx.type in ("deposit", "buy"):
                 val = tx.total_value_usd or (
-                    (tx.price * tx.quantity) if tx.price else Decimal("0")
+                    (tx.price * tx.quantity) if tx.price else ZERO
                 )
-                if val > Decimal("0"):
+                if val > ZERO:
                     cash_flows.append((tx.executed_at.date(), -val))  # salida de dinero
             elif tx.type in ("sell", "withdrawal") and tx.base_asset in FIAT_AND_STABLECOINS:
                 val = tx.total_value_usd or (
-                    (tx.price * tx.quantity) if tx.price else Decimal("0")
+                    (tx.price * tx.quantity) if tx.price else ZERO
                 )
-                if val > Decimal("0"):
+                if val > ZERO:
                     cash_flows.append((tx.executed_at.date(), val))   # entrada de dinero
 
-        if cash_flows and total_value_usd > Decimal("0"):
+        if cash_flows and total_value_usd > ZERO:
             cash_flows.append((date.today(), total_value_usd))
             irr = compute_xirr(cash_flows)
         else:
@@ -725,7 +969,7 @@ class PortfolioService:
         self,
         asset: str,
         current_price: Decimal,
-        eur_usd: Decimal = Decimal("1.08"),
+        eur_usd: Decimal = DEFAULT_EUR_USD,
     ) -> DCAAnalysis:
         """
         Análisis DCA para un activo:
@@ -738,30 +982,30 @@ class PortfolioService:
         buys = [t for t in txns if t.type in {"buy", "deposit"} and t.price is not None]
         sells = [t for t in txns if t.type in SELL_TYPES]
 
-        fifo = compute_fifo(buys, sells, eur_usd=eur_usd)
-        vwap = compute_vwap(buys)
+        # Coste unitario USD una sola vez por compra: lo reutilizan FIFO, VWAP y el calendario
+        buy_costs = [_usd_unit_cost(t) for t in buys]
+        fifo = self._fifo_cached(asset, "dca", buys, sells, eur_usd, buy_costs=buy_costs)
+        vwap = compute_vwap(buys, unit_costs=buy_costs)
 
         # Cantidad actual: usar balance real de Binance si está disponible,
         # si no, calcular desde transacciones (puede diferir por depósitos/comisiones)
         balances = await self._get_latest_balances()
-        total_bought = sum((t.quantity for t in buys), Decimal("0"))
-        total_sold = sum((t.quantity for t in sells), Decimal("0"))
+        total_bought = sum((t.quantity for t in buys), ZERO)
+        total_sold = sum((t.quantity for t in sells), ZERO)
         current_qty = balances.get(asset, total_bought - total_sold)
 
         cost_basis_usd = fifo.cost_basis
         cost_basis_eur = fifo.cost_basis_eur
-        value_usd = (current_qty * current_price).quantize(PRICE_PRECISION, ROUND_HALF_UP)
-        value_eur = (
-            (value_usd / eur_usd).quantize(PRICE_PRECISION, ROUND_HALF_UP)
-            if eur_usd > Decimal("0") else Decimal("0")
-        )
-        pnl_usd = (value_usd - cost_basis_usd).quantize(PRICE_PRECISION, ROUND_HALF_UP)
+        value_usd = _q(current_qty * current_price)
+        value_eur = _q(value_usd / eur_usd) if eur_usd > ZERO else ZERO
+        # Operandos ya redondeados a 8 decimales: las restas son exactas
+        pnl_usd = value_usd - cost_basis_usd
         # pnl_eur: valor actual en EUR - coste base EUR histórico (sin doble conversión)
-        pnl_eur = (value_eur - cost_basis_eur).quantize(PRICE_PRECISION, ROUND_HALF_UP)
+        pnl_eur = value_eur - cost_basis_eur
         pnl_pct = (
-            (pnl_usd / cost_basis_usd * Decimal("100")).quantize(PCT_PRECISION, ROUND_HALF_UP)
-            if cost_basis_usd > Decimal("0")
-            else Decimal("0")
+            _q(pnl_usd / cost_basis_usd * HUNDRED, PCT_PRECISION)
+            if cost_basis_usd > ZERO
+            else ZERO
         )
 
         # Construir calendario: VWAP acumulado en cada compra
@@ -769,47 +1013,33 @@ class PortfolioService:
         # EUR: para BTCEUR, tx.price ya es EUR — no necesita conversión.
         #       para BTCUSDT, usamos usd/eur_usd_actual como aproximación (el usuario
         #       pagó en USDT, no hay un "EUR pagado" exacto sin el tipo histórico).
-        buy_events: list[DCABuyEvent] = []
-        cum_qty = Decimal("0")
-        cum_usd_cost = Decimal("0")
-        cum_eur_cost = Decimal("0")
-
-        for tx in buys:
-            unit_cost_usd = _usd_unit_cost(tx)
-
-            # Precio EUR histórico real: para BTCEUR usamos tx.price directamente,
-            # para BTCUSDT convertimos con el tipo actual (mejor aproximación posible
-            # sin almacenar el tipo histórico por transacción).
-            if tx.quote_asset == "EUR":
-                unit_cost_eur = tx.price if tx.price is not None else Decimal("0")
-            else:
-                unit_cost_eur = (
-                    (unit_cost_usd / eur_usd).quantize(PRICE_PRECISION, ROUND_HALF_UP)
-                    if eur_usd > Decimal("0")
-                    else Decimal("0")
-                )
-
-            cum_qty += tx.quantity
-            cum_usd_cost += unit_cost_usd * tx.quantity
-            cum_eur_cost += unit_cost_eur * tx.quantity
-
-            cum_vwap = (cum_usd_cost / cum_qty).quantize(PRICE_PRECISION, ROUND_HALF_UP) if cum_qty > Decimal("0") else Decimal("0")
-            cum_vwap_eur = (cum_eur_cost / cum_qty).quantize(PRICE_PRECISION, ROUND_HALF_UP) if cum_qty > Decimal("0") else Decimal("0")
-
-            buy_events.append(
-                DCABuyEvent(
-                    executed_at=tx.executed_at,
-                    quantity=tx.quantity,
-                    price_usd=unit_cost_usd,
-                    price_eur=unit_cost_eur,
-                    cumulative_quantity=cum_qty,
-                    cumulative_vwap=cum_vwap,
-                    cumulative_vwap_eur=cum_vwap_eur,
-                )
+        # Series acumuladas en una pasada (accumulate); solo se redondea lo emitido.
+        qtys = [tx.quantity for tx in buys]
+        eur_costs = [_eur_unit_cost(tx, eur_usd, uc) for tx, uc in zip(buys, buy_costs)]
+        cum_qtys = list(accumulate(qtys))
+        cum_usd_costs = list(accumulate(map(mul, qtys, buy_costs)))
+        cum_eur_costs = list(accumulate(map(mul, qtys, eur_costs)))
+
+        def running_vwap(cum_cost: Decimal, cum_qty: Decimal) -> Decimal:
+            return _q(cum_cost / cum_qty) if cum_qty > ZERO else ZERO
+
+        buy_events = [
+            DCABuyEvent(
+                executed_at=tx.executed_at,
+                quantity=qty,
+                price_usd=unit_cost_usd,
+                price_eur=unit_cost_eur,
+                cumulative_quantity=cum_qty,
+                cumulative_vwap=running_vwap(cum_usd, cum_qty),
+                cumulative_vwap_eur=running_vwap(cum_eur, cum_qty),
+            )
+            for tx, qty, unit_cost_usd, unit_cost_eur, cum_qty, cum_usd, cum_eur in zip(
+                buys, qtys, buy_costs, eur_costs, cum_qtys, cum_usd_costs, cum_eur_costs
             )
+        ]
 
         # VWAP EUR histórico total (mismo cálculo que el acumulado final)
-        vwap_eur = (cum_eur_cost / cum_qty).quantize(PRICE_PRECISION, ROUND_HALF_UP) if cum_qty > Decimal("0") else Decimal("0")
+        vwap_eur = running_vwap(cum_eur_costs[-1], cum_qtys[-1]) if buys else ZERO
 
         return DCAAnalysis(
             asset=asset,
@@ -830,7 +1060,7 @@ class PortfolioService:
         self,
         from_date: date,
         to_date: date,
-        eur_usd: Decimal = Decimal("1.08"),
+        eur_usd: Decimal = DEFAULT_EUR_USD,
     ) -> list[PerformancePoint]:
         """
         Serie temporal diaria de valor del portafolio.
@@ -845,11 +1075,11 @@ class PortfolioService:
             for snap in snapshots:
                 pnl_usd = snap.total_value_usd - snap.invested_usd
                 pnl_pct = (
-                    (pnl_usd / snap.invested_usd * Decimal("100")).quantize(
+                    (pnl_usd / snap.invested_usd * HUNDRED).quantize(
                         PCT_PRECISION, ROUND_HALF_UP
                     )
-                    if snap.invested_usd > Decimal("0")
-                    else Decimal("0")
+                    if snap.invested_usd > ZERO
+                    else ZERO
                 )
                 points.append(
                     PerformancePoint(
@@ -860,7 +1090,7 @@ class PortfolioService:
                         # (aceptable hasta que el scheduler almacene invested_eur)
                         invested_eur=(
                             snap.invested_usd / eur_usd
-                            if eur_usd > Decimal("0")
+                            if eur_usd > ZERO
                             else snap.invested_usd
                         ).quantize(PRICE_PRECISION, ROUND_HALF_UP),
                         pnl_usd=pnl_usd.quantize(PRICE_PRECISION, ROUND_HALF_UP),
@@ -876,7 +1106,7 @@ class PortfolioService:
         self,
         from_date: date,
         to_date: date,
-        eur_usd: Decimal = Decimal("1.08"),
+        eur_usd: Decimal = DEFAULT_EUR_USD,
     ) -> list[PerformancePoint]:
         """
         Genera la serie temporal del portafolio desde price_history de BTCUSDT
@@ -889,8 +1119,6 @@ class PortfolioService:
             - valor_dia = btc_qty * close_price
         - Solo emite puntos a partir del día de la primera compra.
         """
-        from datetime import timezone
-
         from models.price_history import PriceHistory
 
         from_dt = datetime.combine(from_date, datetime.min.time()).replace(tzinfo=timezone.utc)
@@ -898,7 +1126,7 @@ class PortfolioService:
 
         # Precios diarios BTCUSDT en el rango
         price_q = (
-            select(PriceHistory)
+            select(PriceHistory.open_at, PriceHistory.close)
             .where(
                 PriceHistory.symbol == "BTCUSDT",
                 PriceHistory.interval == "1d",
@@ -907,70 +1135,111 @@ class PortfolioService:
             )
             .order_by(PriceHistory.open_at)
         )
-        price_rows = list((await self.db.execute(price_q)).scalars().all())
+        price_rows = (await self.db.execute(price_q)).all()
         if not price_rows:
             return []
 
-        # Todas las transacciones BTC de la cuenta hasta to_date
-        tx_q = (
-            select(Transaction)
-            .where(
-                Transaction.account_id == self.account_id,
-                Transaction.base_asset == "BTC",
-                Transaction.executed_at <= to_dt,
+        # Transacciones BTC hasta to_date (ordenadas: se corta con bisect)
+        txns = await self._get_btc_history_txns()
+        cut = bisect_right(txns, to_dt, key=attrgetter("executed_at"))
+        return self._build_synthetic_history(price_rows, txns[:cut], eur_usd)
+
+    async def _get_btc_history_txns(self) -> list[Row]:
+        """
+        Todas las transacciones BTC de la cuenta ordenadas por fecha, solo con
+        las columnas que usa la historia sintética. Memoizadas en la instancia.
+        """
+        if self._btc_history_txns is None:
+            tx_q = (
+                select(
+                    Transaction.type,
+                    Transaction.quote_asset,
+                    Transaction.quantity,
+                    Transaction.price,
+                    Transaction.total_value_usd,
+                    Transaction.executed_at,
+                )
+                .where(
+                    Transaction.account_id == self.account_id,
+                    Transaction.base_asset == "BTC",
+                )
+                .order_by(Transaction.executed_at)
             )
-            .order_by(Transaction.executed_at)
-        )
-        txns = list((await self.db.execute(tx_q)).scalars().all())
+            self._btc_history_txns = list((await self.db.execute(tx_q)).all())
+        return self._btc_history_txns
+
+    @staticmethod
+    def _build_synthetic_history(
+        price_rows: Iterable[Row],
+        txns: list[Row],
+        eur_usd: Decimal = DEFAULT_EUR_USD,
+    ) -> list[PerformancePoint]:
+        """
+        Construye la serie diaria a partir de filas ya cargadas: price_rows
+        (open_at, close) y txns ordenadas por executed_at. Sin acceso a BD.
+        """
         if not txns:
             return []
 
+        # Deltas por día en una sola pasada: el recorrido de precios avanza por
+        # días con actividad en lugar de por transacción (y .date() una vez por tx)
+        day_deltas: list[tuple[date, Decimal, Decimal, Decimal]] = []
+        for day, day_txns in groupby(txns, key=lambda t: t.executed_at.date()):
+            d_qty = d_invested = d_invested_eur = ZERO
+            for tx in day_txns:
+                if tx.type in ("buy", "deposit"):
+                    d_qty += tx.quantity
+                    # `is not None` (no `or`): un total_value_usd de 0 es un valor
+                    # conocido, igual que en la rama EUR de abajo
+                    if tx.total_value_usd is not None:
+                        d_invested += tx.total_value_usd
+                    elif tx.price:
+                        d_invested += tx.price * tx.quantity
+                    # EUR directo: evita el error de doble conversión EUR→USD→EUR
+                    if tx.quote_asset == "EUR" and tx.price is not None:
+                        d_invested_eur += tx.price * tx.quantity
+                    elif tx.total_value_usd is not None and eur_usd > ZERO:
+                        d_invested_eur += tx.total_value_usd / eur_usd
+                    elif tx.price is not None:
+                        d_invested_eur += tx.price * tx.quantity
+                elif tx.type in ("sell", "withdrawal"):
+                    d_qty -= tx.quantity
+                    # No reducir invested: mostramos capital total desplegado
+            day_deltas.append((day, d_qty, d_invested, d_invested_eur))
+
         # Fecha de la primera transacción (solo emitir desde ese día)
-        first_tx_date = txns[0].executed_at.date()
+        first_tx_date = day_deltas[0][0]
 
         # Acumuladores
-        cum_qty = Decimal("0")
-        cum_invested = Decimal("0")      # en USD (para pnl_usd y pnl_pct)
-        cum_invested_eur = Decimal("0")  # en EUR directo, sin doble conversión
-        tx_idx = 0
-        n_txns = len(txns)
+        cum_qty = ZERO
+        cum_invested = ZERO      # en USD (para pnl_usd y pnl_pct)
+        cum_invested_eur = ZERO  # en EUR directo, sin doble conversión
+        delta_idx = 0
+        n_deltas = len(day_deltas)
 
         points: list[PerformancePoint] = []
 
         for ph in price_rows:
             day = ph.open_at.date()
 
-            # Avanzar transacciones que ocurrieron en o antes de este día
-            while tx_idx < n_txns and txns[tx_idx].executed_at.date() <= day:
-                tx = txns[tx_idx]
-                val = tx.total_value_usd or (
-                    (tx.price * tx.quantity) if tx.price else Decimal("0")
-                )
-                if tx.type in ("buy", "deposit"):
-                    cum_qty += tx.quantity
-                    cum_invested += val
-                    # EUR directo: evita el error de doble conversión EUR→USD→EUR
-                    if tx.quote_asset == "EUR" and tx.price is not None:
-                        cum_invested_eur += tx.price * tx.quantity
-                    elif tx.total_value_usd is not None and eur_usd > Decimal("0"):
-                        cum_invested_eur += tx.total_value_usd / eur_usd
-                    elif tx.price is not None:
-                        cum_invested_eur += tx.price * tx.quantity
-                elif tx.type in ("sell", "withdrawal"):
-                    cum_qty -= tx.quantity
-                    # No reducir cum_invested: mostramos capital total desplegado
-                tx_idx += 1
+            # Aplicar los días con transacciones en o antes de este día
+            while delta_idx < n_deltas and day_deltas[delta_idx][0] <= day:
+                _, d_qty, d_invested, d_invested_eur = day_deltas[delta_idx]
+                cum_qty += d_qty
+                cum_invested += d_invested
+                cum_invested_eur += d_invested_eur
+                delta_idx += 1
 
             # Solo emitir puntos a partir de la primera compra y con posición positiva
-            if day < first_tx_date or cum_qty <= Decimal("0"):
+            if day < first_tx_date or cum_qty <= ZERO:
                 continue
 
-            value_usd = (cum_qty * ph.close).quantize(PRICE_PRECISION, ROUND_HALF_UP)
-            pnl_usd = (value_usd - cum_invested).quantize(PRICE_PRECISION, ROUND_HALF_UP)
+            value_usd = _q(cum_qty * ph.close)
+            pnl_usd = _q(value_usd - cum_invested)
             pnl_pct = (
-                (pnl_usd / cum_invested * Decimal("100")).quantize(PCT_PRECISION, ROUND_HALF_UP)
-                if cum_invested > Decimal("0")
-                else Decimal("0")
+                _q(pnl_usd / cum_invested * HUNDRED, PCT_PRECISION)
+                if cum_invested > ZERO
+                else ZERO
             )
 
             points.append(
@@ -978,7 +1247,7 @@ class PortfolioService:
                     snapshot_date=day,
                     total_value_usd=value_usd,
                     invested_usd=cum_invested,
-                    invested_eur=cum_invested_eur.quantize(PRICE_PRECISION, ROUND_HALF_UP),
+                    invested_eur=_q(cum_invested_eur),
                     pnl_usd=pnl_usd,
                     pnl_pct=pnl_pct,
                 )
@@ -996,25 +1265,18 @@ class PortfolioService:
             return compute_drawdown(snapshots)
 
         # Drawdown desde historia sintética (todo el rango disponible)
-        today = date.today()
-        from datetime import date as date_cls
         synthetic = await self._synthetic_performance_history(
-            from_date=date_cls(2021, 1, 1), to_date=today
+            from_date=date(2021, 1, 1), to_date=date.today()
         )
         if not synthetic:
             return DrawdownResult(
-                max_drawdown_pct=Decimal("0"),
+                max_drawdown_pct=ZERO,
                 peak_date=None,
                 trough_date=None,
-                peak_value_usd=Decimal("0"),
-                trough_value_usd=Decimal("0"),
+                peak_value_usd=ZERO,
+                trough_value_usd=ZERO,
             )
 
-        # Convertir PerformancePoint a objetos duck-typed que compute_drawdown acepta
-        @dataclass
-        class _Snap:
-            snapshot_date: date
-            total_value_usd: Decimal
-
-        fake_snaps = [_Snap(p.snapshot_date, p.total_value_usd) for p in synthetic]
-        return compute_drawdown(fake_snaps)  # type: ignore[arg-type]
+        # PerformancePoint ya expone snapshot_date y total_value_usd: compute_drawdown
+        # lo consume directamente (sin copiar la serie a objetos intermedios)
+        return compute_drawdown(synthetic)  # type: ignore[arg-type]
@@ -10,21 +10,80 @@ Reglas (skill binance-client):
 
 import asyncio
 import hashlib
-import hmac
 import logging
+import re
 import time
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Any
 from urllib.parse import urlencode
 
 import httpx
+import orjson
 import structlog
 
 logger = structlog.get_logger(__name__)
 
 WEIGHT_LIMIT: int = 1200
 WEIGHT_PAUSE_THRESHOLD: int = 1100  # pausar antes de llegar al límite
+_MAX_RETRIES: int = 3
+_BASE_BACKOFF: float = 2.0  # segundos
+_RECV_WINDOW: int = 5000  # ms de tolerancia del timestamp firmado
 _90_DAYS_MS: int = 90 * 24 * 60 * 60 * 1000
+_24_HOURS_MS: int = 24 * 60 * 60 * 1000  # rango máximo startTime-endTime en myTrades
+_SHA256_BLOCK: int = 64
+_IPAD = bytes(b ^ 0x36 for b in range(256))  # tablas XOR para bytes.translate
+_OPAD = bytes(b ^ 0x5C for b in range(256))
+DEFAULT_WINDOW_CONCURRENCY: int = 5  # ventanas de 90 días pedidas en paralelo
+TICKER_CACHE_TTL_SECONDS: float = 5.0  # vida de un precio de ticker en caché
+
+
+def _hmac_pads(key: bytes) -> tuple[Any, Any]:
+    """
+    Estados SHA-256 con el bloque k^ipad / k^opad ya comprimido (RFC 2104).
+    Claves más largas que el bloque (64 B) se reducen antes con SHA-256.
+    """
+    if len(key) > _SHA256_BLOCK:
+        key = hashlib.sha256(key).digest()
+    key = key.ljust(_SHA256_BLOCK, b"\0")
+    return (
+        hashlib.sha256(key.translate(_IPAD)),
+        hashlib.sha256(key.translate(_OPAD)),
+    )
+
+
+# Caracteres que urlencode (quote_plus) deja tal cual, más los separadores
+_QUERY_SAFE = re.compile(r"[A-Za-z0-9_.~=&-]*")
+
+
+def _encode_query(params: dict[str, Any]) -> str:
+    """
+    urlencode() para los parámetros de Binance (símbolos, enteros): un join
+    directo de k=v, ~4x más rápido en la ruta de firma. Si algún valor
+    necesitara escape (o trae '=' / '&'), se delega en urlencode para que la
+    query firmada sea idéntica a la enviada.
+    """
+    query = "&".join([f"{k}={v}" for k, v in params.items()])
+    if (
+        _QUERY_SAFE.fullmatch(query)
+        and query.count("=") == len(params)
+        and query.count("&") == len(params) - 1
+    ):
+        return query
+    return urlencode(params)
+
+
+def _time_windows(since_ms: int | None, now_ms: int) -> list[tuple[int, int]]:
+    """
+    Parte [since_ms, now_ms] en ventanas consecutivas de 90 días (límite de la API).
+    Aritmética entera: cada ventana empieza 90 días + 1 ms después de la anterior,
+    así que los inicios salen de un único range() sin bucle dependiente.
+    """
+    window_start = since_ms if since_ms is not None else 0
+    step = _90_DAYS_MS + 1
+    return [
+        (start, min(start + _90_DAYS_MS, now_ms))
+        for start in range(window_start, now_ms, step)
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -59,23 +118,46 @@ class RateLimitManager:
     """
     Rastrea X-MBX-USED-WEIGHT-1M de cada respuesta.
     Si el peso acumulado supera el umbral, pausa hasta el siguiente minuto.
+
+    El fin de la ventana de peso se guarda en reloj monotónico al abrirse, así
+    que check() no lee el reloj mientras el peso esté por debajo del umbral.
+    El lock hace que peticiones concurrentes (ventanas en paralelo) esperen
+    una sola pausa en lugar de dormir cada una por su cuenta.
     """
 
     def __init__(self) -> None:
         self._used_weight: int = 0
+        self._window_reset_at: float = 0.0  # time.monotonic() del próximo minuto
+        self._lock = asyncio.Lock()
+        # update() corre en cada respuesta: con DEBUG filtrado se evita construir
+        # el evento de structlog. Se evalúa una vez (la config de logging ya está
+        # fijada cuando se crean los clientes)
+        self._debug_enabled = logger.is_enabled_for(logging.DEBUG)
+
+    @staticmethod
+    def _next_minute_monotonic() -> float:
+        """Próximo cambio de minuto (donde Binance resetea el peso) en reloj monotónico."""
+        return time.monotonic() + 60.0 - time.time() % 60
 
     def update(self, headers: httpx.Headers) -> None:
         raw = headers.get("X-MBX-USED-WEIGHT-1M")
         if raw:
             self._used_weight = int(raw)
-            logger.debug("rate_limit.weight", used=self._used_weight, limit=WEIGHT_LIMIT)
+            if time.monotonic() >= self._window_reset_at:
+                self._window_reset_at = self._next_minute_monotonic()
+            if self._debug_enabled:
+                logger.debug("rate_limit.weight", used=self._used_weight, limit=WEIGHT_LIMIT)
 
     async def check(self) -> None:
         """Bloquea si estamos cerca del límite, esperando al siguiente minuto."""
-        if self._used_weight >= WEIGHT_PAUSE_THRESHOLD:
-            now = time.time()
-            seconds_into_minute = now % 60
-            wait = 60.0 - seconds_into_minute + 1.0  # +1s de margen
+        if self._used_weight < WEIGHT_PAUSE_THRESHOLD:
+            return
+
+        async with self._lock:
+            if self._used_weight < WEIGHT_PAUSE_THRESHOLD:
+                return  # otra petición ya esperó al reset mientras aguardábamos el lock
+            reset_at = self._window_reset_at or self._next_minute_monotonic()
+            wait = max(reset_at - time.monotonic(), 0.0) + 1.0  # +1s de margen
             logger.warning(
                 "rate_limit.pause",
                 used_weight=self._used_weight,
@@ -84,6 +166,7 @@ class RateLimitManager:
             )
             await asyncio.sleep(wait)
             self._used_weight = 0
+            self._window_reset_at = 0.0
 
 
 # ---------------------------------------------------------------------------
@@ -103,8 +186,9 @@ class BinanceClient:
     NUNCA loguear api_key ni api_secret.
     """
 
-    MAX_RETRIES: int = 3
-    BASE_BACKOFF: float = 2.0  # segundos
+    # Alias públicos de las constantes de módulo (las usan tests y llamadores)
+    MAX_RETRIES: int = _MAX_RETRIES
+    BASE_BACKOFF: float = _BASE_BACKOFF
 
     def __init__(
         self,
@@ -112,15 +196,34 @@ class BinanceClient:
         api_secret: str,
         base_url: str = "https://api.binance.com",
         http_client: httpx.AsyncClient | None = None,
+        window_concurrency: int = DEFAULT_WINDOW_CONCURRENCY,
     ) -> None:
         # Las credenciales se guardan en atributos privados y NUNCA se loguean
         self._api_key = api_key
         self._api_secret = api_secret
+        # Estados SHA-256 interno/externo del HMAC ya absorbida la clave
+        # (ipad/opad): _signature() solo los copia (ver _hmac_pads)
+        self._inner_base, self._outer_base = _hmac_pads(api_secret.encode("utf-8"))
         self._base_url = base_url.rstrip("/")
         self._rate_limit = RateLimitManager()
+        self._window_concurrency = max(1, window_concurrency)
+        # Caché de tickers: symbol → (expira_en monotónico, respuesta). Un lock
+        # por símbolo hace que peticiones concurrentes compartan una sola llamada
+        self._ticker_cache: dict[str, tuple[float, dict]] = {}
+        self._ticker_locks: dict[str, asyncio.Lock] = {}
+        # HTTP/2: las peticiones concurrentes (ventanas, símbolos) se multiplexan
+        # sobre una sola conexión TLS en lugar de abrir un handshake por socket
         self._client = http_client or httpx.AsyncClient(
             base_url=self._base_url,
-            timeout=httpx.Timeout(30.0),
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=20,
+                keepalive_expiry=90,
+            ),
+            # pool=5 s: bajo concurrencia, esperar un hueco de conexión falla
+            # rápido (PoolTimeout → retry con backoff) en vez de bloquear 30 s
+            timeout=httpx.Timeout(30.0, connect=5.0, read=30.0, pool=5.0),
             headers={"X-MBX-APIKEY": self._api_key},
         )
 
@@ -137,6 +240,19 @@ class BinanceClient:
     # Firma HMAC-SHA256
     # -----------------------------------------------------------------------
 
+    def _signature(self, payload: str) -> str:
+        """
+        HMAC-SHA256 hex de payload: H(k^opad || H(k^ipad || payload)) a partir
+        de los estados precalculados. Dos copy() de hashlib en C, sin el
+        objeto hmac.HMAC (cuyo copy() es ~2x más lento) ni hmac.digest(), que
+        repite el key schedule en cada llamada.
+        """
+        inner = self._inner_base.copy()
+        inner.update(payload.encode("utf-8"))
+        outer = self._outer_base.copy()
+        outer.update(inner.digest())
+        return outer.hexdigest()
+
     def _sign(self, params: dict[str, Any]) -> dict[str, Any]:
         """
         Añade timestamp, recvWindow y firma HMAC-SHA256 a los parámetros.
@@ -145,17 +261,50 @@ class BinanceClient:
         signed: dict[str, Any] = {
             **params,
             "timestamp": int(time.time() * 1000),
-            "recvWindow": 5000,
+            "recvWindow": _RECV_WINDOW,
         }
-        query_string = urlencode(signed)
-        signature = hmac.new(
-            self._api_secret.encode("utf-8"),
-            query_string.encode("utf-8"),
-            hashlib.sha256,
-        ).hexdigest()
-        signed["signature"] = signature
+        signed["signature"] = self._signature(_encode_query(signed))
         return signed
 
+    def _resign(self, signed: dict[str, Any]) -> None:
+        """
+        Re-firma en sitio un dict ya devuelto por _sign() (retry tras 429):
+        solo cambian timestamp y signature; el orden de claves se conserva,
+        así que la query firmada sigue siendo la que envía httpx.
+        """
+        del signed["signature"]
+        signed["timestamp"] = int(time.time() * 1000)
+        signed["signature"] = self._signature(_encode_query(signed))
+
+    def _sign_query(self, base_query: str, params: dict[str, Any]) -> str:
+        """
+        Variante de _sign() para una query base ya codificada (p. ej.
+        "symbol=BTCUSDT&limit=1000"): solo se codifican los parámetros que
+        cambian entre páginas más timestamp/recvWindow, y se firma el string
+        exacto que se envía.
+        """
+        query = _encode_query(
+            {**params, "timestamp": int(time.time() * 1000), "recvWindow": _RECV_WINDOW}
+        )
+        query = f"{base_query}&{query}" if base_query else query
+        return f"{query}&signature={self._signature(query)}"
+
+    def _prepare(
+        self,
+        path: str,
+        params: dict[str, Any] | None,
+        signed: bool,
+        base_query: str | None,
+    ) -> tuple[str, dict[str, Any] | None]:
+        """(url, params) listos para httpx; con base_query la query va ya en la URL."""
+        if base_query is None:
+            request_params = dict(params or {})
+            return path, self._sign(request_params) if signed else request_params
+        if signed:
+            return f"{path}?{self._sign_query(base_query, params or {})}", None
+        extra = _encode_query(params) if params else ""
+        return f"{path}?{base_query}&{extra}" if extra else f"{path}?{base_query}", None
+
     # -----------------------------------------------------------------------
     # Request base con retry y rate limit
     # -----------------------------------------------------------------------
@@ -167,24 +316,25 @@ class BinanceClient:
         *,
         signed: bool = True,
         params: dict[str, Any] | None = None,
+        base_query: str | None = None,
     ) -> Any:
         """
         Ejecuta una petición HTTP con:
         - Firma opcional (endpoints privados)
         - Comprobación de rate limit antes de enviar
         - Retry con backoff exponencial en 429/418 y errores de red
+        base_query: parte fija de la query ya codificada (paginadores); params
+        contiene entonces solo lo que cambia entre peticiones.
         """
-        request_params = dict(params or {})
-        if signed:
-            request_params = self._sign(request_params)
+        url, request_params = self._prepare(path, params, signed, base_query)
 
         last_exc: Exception | None = None
 
-        for attempt in range(self.MAX_RETRIES):
+        for attempt in range(_MAX_RETRIES):
             await self._rate_limit.check()
 
             try:
-                response = await self._client.request(method, path, params=request_params)
+                response = await self._client.request(method, url, params=request_params)
                 self._rate_limit.update(response.headers)
 
                 # Rate limit superado — Binance devuelve 429 o 418 (ban)
@@ -197,32 +347,35 @@ class BinanceClient:
                         attempt=attempt,
                         path=path,
                     )
-                    if attempt < self.MAX_RETRIES - 1:
+                    if attempt < _MAX_RETRIES - 1:
                         await asyncio.sleep(retry_after)
                         # Re-firmar con nuevo timestamp tras la espera
-                        if signed:
-                            request_params = self._sign(dict(params or {}))
+                        if signed and request_params is not None:
+                            self._resign(request_params)
+                        elif signed:
+                            url, request_params = self._prepare(path, params, signed, base_query)
                         continue
                     raise BinanceRateLimitError(response.status_code, retry_after)
 
                 # Error de autenticación
                 if response.status_code == 401:
-                    data = response.json()
+                    data = orjson.loads(response.content)
                     raise BinanceAuthError(401, data.get("code", -2014), data.get("msg", "Auth error"))
 
                 # Otros errores HTTP
                 if response.status_code >= 400:
-                    data = response.json()
+                    data = orjson.loads(response.content)
                     raise BinanceAPIError(
                         response.status_code,
                         data.get("code", -1),
                         data.get("msg", "Unknown error"),
                     )
 
-                return response.json()
+                # orjson (C) en lugar de json stdlib: klines/trades llegan en lotes de 1000
+                return orjson.loads(response.content)
 
             except (httpx.TimeoutException, httpx.NetworkError) as exc:
-                backoff = self.BASE_BACKOFF ** (attempt + 1)
+                backoff = _BASE_BACKOFF ** (attempt + 1)
                 logger.warning(
                     "binance.network_error",
                     path=path,
@@ -231,18 +384,65 @@ class BinanceClient:
                     error=str(exc),
                 )
                 last_exc = exc
-                if attempt < self.MAX_RETRIES - 1:
+                if attempt < _MAX_RETRIES - 1:
                     await asyncio.sleep(backoff)
 
         raise last_exc or RuntimeError(f"Max retries exceeded for {path}")
 
+    async def _gather_windows(
+        self,
+        fetch: Callable[..., Awaitable[list[dict]]],
+        windows: list[tuple[int, int]],
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Pide ventanas independientes (sin cursor) en grupos de
+        window_concurrency peticiones concurrentes. gather conserva el orden,
+        así que los lotes se emiten en orden cronológico; las ventanas vacías
+        no generan yield. El RateLimitManager se consulta en cada petición.
+        """
+        step = self._window_concurrency
+        for i in range(0, len(windows), step):
+            batches = await asyncio.gather(
+                *(fetch(start_time=start, end_time=end) for start, end in windows[i:i + step])
+            )
+            for batch in batches:
+                if batch:
+                    yield batch
+
     # -----------------------------------------------------------------------
     # Endpoints públicos
     # -----------------------------------------------------------------------
 
+    async def ping(self) -> None:
+        """
+        GET /api/v3/ping — peso 1. Abre la conexión HTTP/2 antes de lanzar
+        peticiones concurrentes: si llegan todas con el pool vacío, cada una
+        puede hacer su propio handshake TLS en vez de multiplexarse sobre una.
+        """
+        await self._request("GET", "/api/v3/ping", signed=False)
+
     async def get_ticker_price(self, symbol: str) -> dict:
-        """GET /api/v3/ticker/price — precio actual de un par."""
-        return await self._request("GET", "/api/v3/ticker/price", signed=False, params={"symbol": symbol})
+        """
+        GET /api/v3/ticker/price — precio actual de un par.
+        Cacheado TICKER_CACHE_TTL_SECONDS: dentro de un ciclo de sync el mismo
+        par se consulta varias veces y las tareas concurrentes que lo piden a
+        la vez esperan a una única petición (single-flight).
+        """
+        cached = self._ticker_cache.get(symbol)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        lock = self._ticker_locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            # Otra tarea pudo rellenar la caché mientras esperábamos el lock
+            cached = self._ticker_cache.get(symbol)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+            data = await self._request(
+                "GET", "/api/v3/ticker/price", signed=False, params={"symbol": symbol}
+            )
+            self._ticker_cache[symbol] = (time.monotonic() + TICKER_CACHE_TTL_SECONDS, data)
+            return data
 
     async def get_klines(
         self,
@@ -330,9 +530,14 @@ class BinanceClient:
         Paginación incremental por fromId. Usar para syncs posteriores al primero.
         Yield: lotes de hasta 1000 trades.
         """
+        # symbol/limit no cambian entre páginas: se codifican una sola vez
+        base_query = urlencode({"symbol": symbol, "limit": 1000})
         current_from_id = from_id
         while True:
-            batch = await self.get_trades(symbol, from_id=current_from_id)
+            page = {"fromId": current_from_id} if current_from_id is not None else {}
+            batch = await self._request(
+                "GET", "/api/v3/myTrades", params=page, base_query=base_query
+            )
             if not batch:
                 break
             yield batch
@@ -344,19 +549,36 @@ class BinanceClient:
         self,
         symbol: str,
         start_time_ms: int = 0,
+        end_time_ms: int | None = None,
     ) -> AsyncIterator[list[dict]]:
         """
-        Descarga todo el historial de trades desde start_time_ms.
-
-        Usa SOLO startTime (sin endTime) para evitar el límite de 24 h de la API
-        de Binance (-1127).  Pagina avanzando el startTime al timestamp del último
-        trade + 1 ms hasta recibir un lote incompleto (< 1000).
+        Descarga el historial de trades desde start_time_ms (hasta end_time_ms
+        inclusive, si se indica).
+
+        Usa solo startTime para evitar el límite de 24 h de la API de Binance
+        (-1127): endTime se envía únicamente cuando lo que queda hasta
+        end_time_ms cabe en 24 h. Antes, el corte se hace aquí: el lote que
+        cruza end_time_ms se recorta y se deja de paginar.
+        Pagina avanzando el startTime al timestamp del último trade + 1 ms hasta
+        recibir un lote incompleto (< 1000).
         """
+        base_query = urlencode({"symbol": symbol, "limit": 1000})
         current_start = start_time_ms
-        while True:
-            batch = await self.get_trades(symbol, start_time=current_start)
+        while end_time_ms is None or current_start <= end_time_ms:
+            params: dict[str, Any] = {"startTime": current_start}
+            if end_time_ms is not None and end_time_ms - current_start <= _24_HOURS_MS:
+                params["endTime"] = end_time_ms
+            batch = await self._request(
+                "GET", "/api/v3/myTrades", params=params, base_query=base_query
+            )
             if not batch:
                 break
+            if end_time_ms is not None and int(batch[-1]["time"]) > end_time_ms:
+                # Lotes ordenados por tiempo: basta con cortar por el final
+                batch = [t for t in batch if int(t["time"]) <= end_time_ms]
+                if batch:
+                    yield batch
+                break
             yield batch
             if len(batch) < 1000:
                 break
@@ -381,20 +603,18 @@ class BinanceClient:
             params["endTime"] = end_time
         return await self._request("GET", "/sapi/v1/capital/deposit/hisrec", params=params)
 
-    async def get_all_deposits(self, since_ms: int | None = None) -> AsyncIterator[list[dict]]:
+    async def get_all_deposits(
+        self,
+        since_ms: int | None = None,
+    ) -> AsyncIterator[list[dict]]:
         """
         Itera depósitos en ventanas de 90 días (límite de la API).
-        desde since_ms (epoch ms) hasta ahora.
+        desde since_ms (epoch ms) hasta ahora. Las ventanas no dependen entre
+        sí: se piden en paralelo (ver _gather_windows).
         """
-        now_ms = int(time.time() * 1000)
-        window_start = since_ms if since_ms is not None else 0
-
-        while window_start < now_ms:
-            window_end = min(window_start + _90_DAYS_MS, now_ms)
-            batch = await self.get_deposits(start_time=window_start, end_time=window_end)
-            if batch:
-                yield batch
-            window_start = window_end + 1
+        windows = _time_windows(since_ms, int(time.time() * 1000))
+        async for batch in self._gather_windows(self.get_deposits, windows):
+            yield batch
 
     async def get_withdrawals(
         self,
@@ -410,17 +630,16 @@ class BinanceClient:
             params["endTime"] = end_time
         return await self._request("GET", "/sapi/v1/capital/withdraw/history", params=params)
 
-    async def get_all_withdrawals(self, since_ms: int | None = None) -> AsyncIterator[list[dict]]:
-        """Itera retiros en ventanas de 90 días."""
-        now_ms = int(time.time() * 1000)
-        window_start = since_ms if since_ms is not None else 0
-
-        while window_start < now_ms:
-            window_end = min(window_start + _90_DAYS_MS, now_ms)
-            batch = await self.get_withdrawals(start_time=window_start, end_time=window_end)
-            if batch:
-                yield batch
-            window_start = window_end + 1
+    async def get_all_withdrawals(
+        self,
+        since_ms: int | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Itera retiros en ventanas de 90 días, pedidas en paralelo (ver _gather_windows).
+        """
+        windows = _time_windows(since_ms, int(time.time() * 1000))
+        async for batch in self._gather_windows(self.get_withdrawals, windows):
+            yield batch
 
     # -----------------------------------------------------------------------
     # Endpoints privados — fiat
@@ -2,18 +2,116 @@
 Proceso independiente del scheduler APScheduler.
 Ejecuta jobs de sincronización periódica con Binance.
 El scheduler es el ÚNICO proceso que escribe datos de Binance en la BD.
-TODO: Implementar en Fase 1c.
+
+Cada ejecución sincroniza todas las cuentas con API Keys en paralelo
+(asyncio.TaskGroup, una tarea por cuenta), limitado por MAX_CONCURRENT_SYNCS.
 
 Arrancar con: python -m sync.scheduler
 """
 
+import asyncio
 import logging
+import uuid
+from datetime import datetime, timezone
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import select
 
 from core.config import settings
+from core.database import AsyncSessionLocal
+from core.security import decrypt_secret
+from models.account import Account
+from sync.sync_service import SyncService
 
 logging.basicConfig(level=settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+# Pares BTC relevantes para cubrir el historial completo (igual que /sync/trigger)
+SYNC_SYMBOLS = ["BTCUSDT", "BTCEUR", "BTCBUSD", "BTCFDUSD"]
+
+# Tope global de syncs simultáneos: cada uno abre su propio cliente HTTP y
+# consume peso de rate limit de Binance
+_sync_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_SYNCS)
+
+
+async def sync_account(account_id: uuid.UUID, api_key_encrypted: str, api_secret_encrypted: str) -> None:
+    """
+    Sincroniza una cuenta con su propia sesión de BD y su propio BinanceClient
+    (credenciales distintas por cuenta). Nunca propaga excepciones: un fallo
+    en una cuenta no debe cancelar las demás tareas del TaskGroup.
+    """
+    async with _sync_semaphore:
+        try:
+            api_key = decrypt_secret(api_key_encrypted)
+            api_secret = decrypt_secret(api_secret_encrypted)
+        except ValueError:
+            logger.error("Cannot decrypt API keys for account %s", account_id)
+            return
+
+        try:
+            async with AsyncSessionLocal() as db:
+                account = await db.get(Account, account_id)
+                if account is None:
+                    return
+                service = SyncService(
+                    db=db,
+                    account=account,
+                    api_key=api_key,
+                    api_secret=api_secret,
+                    session_factory=AsyncSessionLocal,
+                )
+                stats = await service.sync_all(symbols=SYNC_SYMBOLS)
+                logger.info(
+                    "Account %s synced — records=%d errors=%d",
+                    account_id,
+                    stats.total_records,
+                    len(stats.errors),
+                )
+        except Exception:
+            logger.exception("Sync failed for account %s", account_id)
+
+
+async def sync_all_accounts() -> None:
+    """Job periódico: lanza un sync por cada cuenta con API Keys configuradas."""
+    async with AsyncSessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(
+                    Account.id,
+                    Account.api_key_encrypted,
+                    Account.api_secret_encrypted,
+                ).where(
+                    Account.api_key_encrypted.is_not(None),
+                    Account.api_secret_encrypted.is_not(None),
+                )
+            )
+        ).all()
+
+    if not rows:
+        logger.info("No accounts with API keys — nothing to sync")
+        return
+
+    async with asyncio.TaskGroup() as tg:
+        for account_id, key_enc, secret_enc in rows:
+            tg.create_task(sync_account(account_id, key_enc, secret_enc))
+
+
+async def _run() -> None:
+    scheduler = AsyncIOScheduler(timezone=timezone.utc)
+    scheduler.add_job(
+        sync_all_accounts,
+        "interval",
+        minutes=settings.SYNC_INTERVAL_MINUTES,
+        next_run_time=datetime.now(timezone.utc),
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        scheduler.shutdown(wait=False)
+
 
 def main() -> None:
     logger.info(
@@ -21,9 +119,10 @@ def main() -> None:
         settings.SYNC_INTERVAL_MINUTES,
         settings.APP_ENV,
     )
-    # TODO: configurar APScheduler con BlockingScheduler
-    # TODO: añadir job sync_all_accounts() cada SYNC_INTERVAL_MINUTES
-    logger.warning("Scheduler not yet implemented. Exiting.")
+    try:
+        asyncio.run(_run())
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Scheduler stopped")
 
 
 if __name__ == "__main__":
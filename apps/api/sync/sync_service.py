@@ -8,32 +8,165 @@ Reglas:
 - Logging estructurado de cada sync con total de registros importados y errores.
 """
 
+import asyncio
+import copy
 import time
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from functools import lru_cache
+from itertools import islice
+from typing import TypeVar
 
+import asyncpg
+import orjson
 import structlog
-from sqlalchemy import select, func
+from sqlalchemy import select, text
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from core.config import settings
 from models.account import Account
 from models.balance_snapshot import BalanceSnapshot
-from models.price_history import PriceHistory
-from models.transaction import Transaction
 from sync.binance_client import BinanceClient, BinanceAPIError
 
 logger = structlog.get_logger(__name__)
 
 
+# Columnas que rellenan los _map_*, en el orden de COPY y de los arrays de UNNEST
+_TRANSACTION_COLUMNS: tuple[str, ...] = (
+    "account_id", "binance_id", "type", "base_asset", "quote_asset",
+    "quantity", "price", "fee_asset", "fee_amount",
+    "executed_at", "raw_data",
+)
+_TRANSACTION_COLUMN_LIST = ", ".join(_TRANSACTION_COLUMNS)
+
+# Importes que los _map_* dejan como texto de la API (sin Decimal por fila):
+# PostgreSQL los parsea a NUMERIC con el cast del SELECT de inserción
+_TEXT_NUMERIC_COLUMNS: tuple[str, ...] = ("quantity", "price", "fee_amount")
+
+# SELECT común a UNNEST y a la tabla de staging de COPY: convierte las columnas
+# que viajan como texto a su tipo (no-op si ya lo tienen). executed_at viaja
+# como epoch-ms (BIGINT, como lo da la API): sin datetime por fila en Python,
+# misma conversión a TIMESTAMPTZ que en _UPSERT_PRICES_SQL.
+_TRANSACTION_SELECT_LIST = (
+    "account_id, binance_id, type::transaction_type, base_asset, quote_asset, "
+    "quantity::numeric, price::numeric, fee_asset, fee_amount::numeric, "
+    "TIMESTAMPTZ 'epoch' + executed_at * INTERVAL '1 millisecond', raw_data::jsonb"
+)
+
+# Upsert de un lote como 11 arrays (uno por columna) desempaquetados con UNNEST:
+# el SQL no depende del número de filas, así que asyncpg lo prepara una vez por
+# conexión y reutiliza el plan (su caché de sentencias) en todos los lotes.
+# type, raw_data y los importes viajan como text y se convierten en el SELECT.
+# id no viaja: lo rellena el DEFAULT gen_random_uuid() de la tabla; tampoco
+# total_value_usd, que se calcula en SQL en _enrich_trade_usd_values.
+_UPSERT_TRANSACTIONS_SQL = (
+    f"INSERT INTO transactions ({_TRANSACTION_COLUMN_LIST}) "
+    f"SELECT {_TRANSACTION_SELECT_LIST} "
+    "FROM unnest("
+    "$1::uuid[], $2::text[], $3::text[], $4::text[], $5::text[], "
+    "$6::text[], $7::text[], $8::text[], $9::text[], "
+    "$10::bigint[], $11::text[]"
+    f") AS u({_TRANSACTION_COLUMN_LIST}) "
+    "ON CONFLICT (binance_id) DO NOTHING "
+    "RETURNING 1"
+)
+
+
+# Saldos cero tal como los devuelve Binance: se descartan sin construir Decimal
+# (cualquier otra forma de cero sigue cayendo en la comparación con Decimal)
+_ZERO_STRS: frozenset[str] = frozenset({"0", "0.0", "0.00000000", ""})
+
+_UTC = timezone.utc
+_EPOCH = datetime(1970, 1, 1, tzinfo=_UTC)
+_ONE_MS = timedelta(milliseconds=1)
+
+
+def _iso_to_ms(value: str) -> int:
+    """
+    Fecha ISO de la API (applyTime, createTime) a epoch-ms UTC, exacto
+    (aritmética de timedelta, sin pasar por float).
+    fromisoformat (C) acepta "Z" desde Python 3.11, sin str.replace por fila.
+    Binance devuelve applyTime sin zona ("2024-01-01 12:00:00"): es UTC.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=_UTC)
+    return (parsed - _EPOCH) // _ONE_MS
+
+
+def _numeric_text(value: str | int | float) -> str:
+    """
+    Importe de la API como texto para una columna NUMERIC. Binance los
+    devuelve como string y van tal cual (PostgreSQL los parsea); un número
+    JSON (float) pasa por str(), nunca se guarda como float binario.
+    """
+    return value if type(value) is str else str(value)
+
+
+# Velas de un lote como arrays por columna (OHLCV como text) → price_history.
+# Tamaño de SQL fijo: asyncpg lo prepara una vez por conexión.
+_UPSERT_PRICES_SQL = (
+    "INSERT INTO price_history (id, symbol, interval, open_at, open, high, low, close, volume) "
+    "SELECT gen_random_uuid(), $1, $2::price_interval, "
+    "TIMESTAMPTZ 'epoch' + u.t * INTERVAL '1 millisecond', "
+    "u.o::numeric, u.h::numeric, u.l::numeric, u.c::numeric, u.v::numeric "
+    "FROM unnest($3::bigint[], $4::text[], $5::text[], $6::text[], $7::text[], $8::text[]) "
+    "AS u(t, o, h, l, c, v) "
+    "ON CONFLICT (symbol, interval, open_at) DO NOTHING"
+)
+
+
+def _json_text(value: dict | None) -> str | None:
+    """raw_data como texto JSON para asyncpg (COPY binario y arrays de UNNEST)."""
+    return orjson.dumps(value).decode() if value is not None else None
+
+
+# Páginas de Binance descargadas por adelantado mientras se escribe en BD
+_PREFETCH_PAGES: int = 4
+
+_T = TypeVar("_T")
+_PREFETCH_DONE = object()
+
+
+async def _prefetch(source: AsyncIterator[_T], maxsize: int = _PREFETCH_PAGES) -> AsyncIterator[_T]:
+    """
+    Productor/consumidor: una tarea descarga páginas de `source` en una cola
+    acotada mientras el llamador escribe las anteriores en BD, solapando la
+    latencia HTTP con la de PostgreSQL. Los errores del productor se relanzan
+    en el consumidor. Solo para bucles que consumen la fuente entera (un break
+    temprano desperdiciaría las páginas ya pedidas).
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    async def produce() -> None:
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as exc:
+            await queue.put(exc)
+        else:
+            await queue.put(_PREFETCH_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (item := await queue.get()) is not _PREFETCH_DONE:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+
+
 # ---------------------------------------------------------------------------
 # Resultado de sincronización
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncStats:
     account_id: uuid.UUID
     started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
@@ -80,6 +213,10 @@ class SyncService:
 
     La decifración de API Keys se hace fuera, en la capa de seguridad,
     antes de construir este servicio (NUNCA aquí).
+
+    Con session_factory, los pasos independientes (balances, precios,
+    depósitos, retiros, fiat) se ejecutan en paralelo, cada uno con su propia
+    sesión: una AsyncSession no admite consultas concurrentes.
     """
 
     def __init__(
@@ -88,17 +225,27 @@ class SyncService:
         account: Account,
         api_key: str,
         api_secret: str,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
     ) -> None:
         self.db = db
         self.account = account
+        self._session_factory = session_factory
         self.stats = SyncStats(account_id=account.id)
-        self._client = BinanceClient(api_key=api_key, api_secret=api_secret)
+        self._client = BinanceClient(
+            api_key=api_key,
+            api_secret=api_secret,
+            window_concurrency=settings.BINANCE_WINDOW_CONCURRENCY,
+        )
 
     async def sync_all(self, symbols: list[str] | None = None) -> SyncStats:
         """
         Sincronización completa: balances + trades + depósitos + retiros + fiat.
         symbols: lista de pares a sincronizar en trades (e.g. ["BTCUSDT", "ETHUSDT"]).
                  Si es None, solo se sincronizan balances + depósitos/retiros.
+
+        Los pasos no hacen commit: todo lo escrito en self.db se confirma de una
+        vez con el estado final. Las tareas con sesión propia (session_factory)
+        hacen un único commit al terminar su paso.
         """
         log = logger.bind(account_id=str(self.account.id))
         log.info("sync.start")
@@ -106,15 +253,30 @@ class SyncService:
         try:
             await self._set_status("syncing")
 
-            await self._run_step("balances",        self._sync_balances())
-            await self._run_step("prices",           self._sync_prices())
+            # Pasos independientes: cada uno toca un endpoint distinto de Binance
+            independent: list[tuple[str, Callable[["SyncService"], Awaitable[None]]]] = [
+                ("balances",         lambda svc: svc._sync_balances()),
+                ("prices",           lambda svc: svc._sync_prices()),
+                ("deposits",         lambda svc: svc._sync_deposits()),
+                ("withdrawals",      lambda svc: svc._sync_withdrawals()),
+                ("fiat_deposits",    lambda svc: svc._sync_fiat(transaction_type=0)),
+                ("fiat_withdrawals", lambda svc: svc._sync_fiat(transaction_type=1)),
+            ]
+            if self._session_factory is None:
+                for name, step in independent:
+                    await self._run_step(name, step(self))
+            else:
+                await self._warm_up_connection()
+                await asyncio.gather(
+                    *(
+                        self._run_step_isolated(self._session_factory, name, step)
+                        for name, step in independent
+                    )
+                )
+
             if symbols:
                 await self._run_step("trades",       self._sync_trades(symbols))
-            await self._run_step("deposits",         self._sync_deposits())
-            await self._run_step("withdrawals",      self._sync_withdrawals())
-            await self._run_step("fiat_deposits",    self._sync_fiat(transaction_type=0))
-            await self._run_step("fiat_withdrawals", self._sync_fiat(transaction_type=1))
-            # Rellenar total_value_usd en trades EUR históricos (backfill idempotente)
+            # total_value_usd de los trades nuevos (USD y EUR) y backfill idempotente
             await self._run_step("enrich_usd",       self._enrich_trade_usd_values())
 
             await self._set_status("idle")
@@ -122,6 +284,7 @@ class SyncService:
         except Exception as exc:
             self.stats.errors.append(str(exc))
             log.error("sync.failed", error=str(exc))
+            await self.db.rollback()
             await self._set_status("error")
 
         finally:
@@ -136,10 +299,27 @@ class SyncService:
         )
         return self.stats
 
+    async def _warm_up_connection(self) -> None:
+        """
+        Abre la conexión HTTP/2 antes del fan-out: todas las tareas comparten el
+        mismo BinanceClient y se multiplexan sobre ella. Es solo una optimización:
+        si el ping falla, cada paso abrirá la conexión y gestionará sus errores.
+        """
+        try:
+            await self._client.ping()
+        except Exception as exc:
+            logger.warning("sync.warm_up_failed", error=str(exc))
+
     async def _run_step(self, name: str, coro) -> None:
-        """Ejecuta un paso de sync capturando errores para no abortar el resto."""
+        """
+        Ejecuta un paso de sync capturando errores para no abortar el resto.
+        Cada paso corre en un SAVEPOINT de la transacción de la sesión: si
+        falla, solo se deshacen sus escrituras y la transacción sigue viva para
+        los pasos siguientes. Los pasos no hacen commit (ver sync_all).
+        """
         try:
-            await coro
+            async with self.db.begin_nested():
+                await coro
         except BinanceAPIError as exc:
             msg = f"{name}: {exc}"
             self.stats.errors.append(msg)
@@ -149,6 +329,28 @@ class SyncService:
             self.stats.errors.append(msg)
             logger.error("sync.step_unexpected_error", step=name, error=msg)
 
+    async def _run_step_isolated(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        name: str,
+        step: Callable[["SyncService"], Awaitable[None]],
+    ) -> None:
+        """
+        _run_step sobre una copia del servicio con sesión propia. La copia
+        comparte cliente, cuenta y stats: los contadores se actualizan con `+=`
+        sin await intermedio, atómico dentro del event loop.
+        """
+        async with session_factory() as db:
+            worker = self._with_session(db)
+            await worker._run_step(name, step(worker))
+            await db.commit()
+
+    def _with_session(self, db: AsyncSession) -> "SyncService":
+        """Copia superficial del servicio que usa otra sesión (tareas concurrentes)."""
+        worker = copy.copy(self)
+        worker.db = db
+        return worker
+
     # -----------------------------------------------------------------------
     # Balances
     # -----------------------------------------------------------------------
@@ -159,36 +361,59 @@ class SyncService:
     )
 
     async def _sync_balances(self) -> None:
-        """Snapshot de balances BTC del momento actual."""
+        """
+        Snapshot de balances BTC del momento actual.
+        INSERT Core en una sentencia: sin identity map ni unit-of-work del ORM
+        (los snapshots solo se insertan, nunca se modifican en esta sesión).
+        Solo se insertan los activos cuyo (free, locked) cambió respecto a su
+        último snapshot: los lectores toman el último por activo (DISTINCT ON),
+        así que repetir un saldo idéntico solo engorda la tabla y sus índices.
+        """
         data = await self._client.get_account()
         now = datetime.now(timezone.utc)
-        count = 0
+        last = await self._load_last_balances()
 
+        rows: list[dict] = []
         for raw in data.get("balances", []):
             asset = raw["asset"]
             if asset not in self._TRACKED_ASSETS:
                 continue
 
-            free = Decimal(raw["free"])
-            locked = Decimal(raw["locked"])
+            free_s, locked_s = raw["free"], raw["locked"]
+            if free_s in _ZERO_STRS and locked_s in _ZERO_STRS:
+                continue
+            free = Decimal(free_s)
+            locked = Decimal(locked_s)
             if free == 0 and locked == 0:
                 continue
+            if last.get(asset) == (free, locked):
+                continue
 
-            self.db.add(
-                BalanceSnapshot(
-                    account_id=self.account.id,
-                    asset=asset,
-                    free=free,
-                    locked=locked,
-                    snapshot_at=now,
-                    value_usd=None,  # se enriquece en Fase 2
-                )
+            rows.append(
+                {
+                    "account_id": self.account.id,
+                    "asset": asset,
+                    "free": free,
+                    "locked": locked,
+                    "snapshot_at": now,
+                    "value_usd": None,  # se enriquece en Fase 2
+                }
             )
-            count += 1
 
-        await self.db.commit()
-        self.stats.balances_saved += count
-        logger.info("sync.balances_done", count=count)
+        if rows:
+            await self.db.execute(pg_insert(BalanceSnapshot.__table__).values(rows))
+        self.stats.balances_saved += len(rows)
+        logger.info("sync.balances_done", count=len(rows))
+
+    async def _load_last_balances(self) -> dict[str, tuple[Decimal, Decimal]]:
+        """(free, locked) del último snapshot de cada activo de la cuenta."""
+        result = await self.db.execute(
+            select(BalanceSnapshot.asset, BalanceSnapshot.free, BalanceSnapshot.locked)
+            .where(BalanceSnapshot.account_id == self.account.id)
+            .distinct(BalanceSnapshot.asset)
+            .order_by(BalanceSnapshot.asset, BalanceSnapshot.snapshot_at.desc())
+        )
+        return {asset: (free, locked) for asset, free, locked in result}
 
     # -----------------------------------------------------------------------
     # Trades
@@ -197,140 +422,241 @@ class SyncService:
     # Inicio del historial: 2021-01-01 00:00:00 UTC
     _HISTORY_START_MS: int = 1_609_459_200_000
 
+    # Pares sincronizados a la vez (peso de myTrades compartido por IP)
+    _TRADE_SYMBOL_CONCURRENCY: int = 4
+
     async def _sync_trades(self, symbols: list[str]) -> None:
         """
         Sync de trades por símbolo.
         - Sin trades en BD: descarga todo desde _HISTORY_START_MS.
         - Con trades en BD pero gap anterior a _HISTORY_START_MS: backfill del gap primero.
         - Siempre termina con sync incremental por fromId para capturar trades nuevos.
+        Con session_factory, los símbolos se sincronizan en paralelo (hasta
+        _TRADE_SYMBOL_CONCURRENCY), cada uno con su propia sesión.
         """
-        total = 0
-        for symbol in symbols:
-            last_id = await self._get_last_trade_id(symbol)
-            count = 0
-
-            if last_id is None:
-                # Primera sincronización: descargar todo el historial completo
-                logger.info("sync.trades_initial", symbol=symbol)
-                async for batch in self._client.get_all_trades_by_time(
-                    symbol, start_time_ms=self._HISTORY_START_MS
-                ):
-                    rows = [self._map_trade(t, symbol) for t in batch]
-                    count += await self._upsert_transactions(rows)
-            else:
-                # Comprobar si falta historial anterior al primer trade conocido
-                first_dt = await self._get_first_trade_datetime(symbol)
-                if first_dt is not None:
-                    first_ms = int(first_dt.timestamp() * 1000)
-                    if first_ms > self._HISTORY_START_MS:
-                        logger.info(
-                            "sync.trades_backfill",
-                            symbol=symbol,
-                            from_ms=self._HISTORY_START_MS,
-                            to_ms=first_ms,
+        cursors = await self._load_trade_cursors(symbols)
+        if self._session_factory is None:
+            total = 0
+            for symbol in symbols:
+                total += await self._sync_symbol_trades(symbol, *cursors[symbol])
+            self.stats.trades_saved += total
+            return
+
+        session_factory = self._session_factory
+        semaphore = asyncio.Semaphore(self._TRADE_SYMBOL_CONCURRENCY)
+
+        async def run(symbol: str) -> int:
+            async with semaphore, session_factory() as db:
+                # El adaptador asyncpg solo emite BEGIN con SQL que pasa por él;
+                # el incremental escribe solo por la conexión del driver. El
+                # SAVEPOINT abre la transacción: un fallo deshace el par entero
+                async with db.begin_nested():
+                    count = await self._with_session(db)._sync_symbol_trades(
+                        symbol, *cursors[symbol]
+                    )
+                await db.commit()
+                return count
+
+        # return_exceptions: un símbolo fallido no deja huérfanos a los demás;
+        # se contabiliza lo guardado y se re-lanza el primer error para _run_step
+        results = await asyncio.gather(*(run(s) for s in symbols), return_exceptions=True)
+        self.stats.trades_saved += sum(r for r in results if isinstance(r, int))
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _sync_symbol_trades(
+        self,
+        symbol: str,
+        last_id: int | None,
+        first_dt: datetime | None,
+    ) -> int:
+        """
+        Sync de trades de un par desde su cursor (ver _load_trade_cursors).
+        Devuelve filas nuevas; el commit lo hace el llamador.
+        """
+        count = 0
+        buffer: list[dict] = []
+
+        if last_id is None:
+            # Primera sincronización: descargar todo el historial completo
+            logger.info("sync.trades_initial", symbol=symbol)
+            count += await self._copy_initial_trades(symbol)
+        else:
+            # Comprobar si falta historial anterior al primer trade conocido
+            if first_dt is not None:
+                first_ms = int(first_dt.timestamp() * 1000)
+                if first_ms > self._HISTORY_START_MS:
+                    logger.info(
+                        "sync.trades_backfill",
+                        symbol=symbol,
+                        from_ms=self._HISTORY_START_MS,
+                        to_ms=first_ms,
+                    )
+                    # Solo trades estrictamente anteriores al primero ya almacenado
+                    async for batch in self._client.get_all_trades_by_time(
+                        symbol, start_time_ms=self._HISTORY_START_MS, end_time_ms=first_ms - 1
+                    ):
+                        count += await self._buffer_transactions(
+                            buffer, self._map_trades(batch, symbol)
                         )
-                        async for batch in self._client.get_all_trades_by_time(
-                            symbol, start_time_ms=self._HISTORY_START_MS
-                        ):
-                            # Solo trades estrictamente anteriores al primero ya almacenado
-                            pre_batch = [t for t in batch if int(t["time"]) < first_ms]
-                            if pre_batch:
-                                rows = [self._map_trade(t, symbol) for t in pre_batch]
-                                count += await self._upsert_transactions(rows)
-                            # Parar al alcanzar el historial ya conocido
-                            if int(batch[-1]["time"]) >= first_ms:
-                                break
-
-                # Sync incremental: trades nuevos desde el último ID conocido
-                logger.info("sync.trades_incremental", symbol=symbol, from_id=last_id)
-                async for batch in self._client.get_all_trades(symbol, from_id=last_id):
-                    rows = [self._map_trade(t, symbol) for t in batch]
-                    count += await self._upsert_transactions(rows)
-
-            total += count
-            logger.info("sync.trades_symbol_done", symbol=symbol, count=count)
-
-        self.stats.trades_saved += total
-
-    async def _get_last_trade_id(self, symbol: str) -> int | None:
-        """
-        Devuelve el último binance_id numérico de trades del par, o None.
-        Usa el par completo (e.g. 'BTCUSDT') almacenado en raw_data,
-        no el base_asset parseado, para evitar colisiones entre pares.
-        binance_id es VARCHAR pero los IDs de trades son numéricos: se ordena MAX().
+
+            # Sync incremental: trades nuevos desde el último ID conocido
+            logger.info("sync.trades_incremental", symbol=symbol, from_id=last_id)
+            async for batch in _prefetch(self._client.get_all_trades(symbol, from_id=last_id)):
+                count += await self._buffer_transactions(
+                    buffer, self._map_trades(batch, symbol)
+                )
+
+        count += await self._flush_transactions(buffer)
+        logger.info("sync.trades_symbol_done", symbol=symbol, count=count)
+        return count
+
+    async def _copy_initial_trades(self, symbol: str) -> int:
         """
+        Carga inicial del historial de un par vía COPY: los lotes se vuelcan con
+        el protocolo COPY de asyncpg a una tabla temporal (sin parser/planner por
+        sentencia) y un único INSERT ... SELECT ... ON CONFLICT DO NOTHING los
+        pasa a transactions. La tabla es local a la sesión, así que símbolos
+        concurrentes no colisionan; se borra al terminar porque en modo
+        secuencial varios pares comparten la misma transacción.
+        Devuelve filas nuevas insertadas. El commit lo hace el llamador.
+        """
+        await self.db.execute(
+            text(
+                "CREATE TEMP TABLE _stage_trades "
+                "(LIKE transactions INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+        )
+        # Los importes llegan como texto de la API (ver _TEXT_NUMERIC_COLUMNS)
+        # y executed_at como epoch-ms
+        await self.db.execute(
+            text(
+                "ALTER TABLE _stage_trades "
+                + ", ".join(f"ALTER {c} TYPE text" for c in _TEXT_NUMERIC_COLUMNS)
+                + ", ALTER executed_at TYPE bigint USING NULL"
+            )
+        )
+        raw_conn = await self._driver_connection()
+
+        async for batch in _prefetch(
+            self._client.get_all_trades_by_time(symbol, start_time_ms=self._HISTORY_START_MS)
+        ):
+            records = []
+            for row in self._map_trades(batch, symbol):
+                row["raw_data"] = _json_text(row["raw_data"])
+                records.append(tuple(row[c] for c in _TRANSACTION_COLUMNS))
+            await raw_conn.copy_records_to_table(
+                "_stage_trades", records=records, columns=_TRANSACTION_COLUMNS
+            )
+
         result = await self.db.execute(
-            select(func.max(Transaction.binance_id)).where(
-                Transaction.account_id == self.account.id,
-                Transaction.type.in_(["buy", "sell"]),
-                # Filtrar por par completo usando el campo raw_data
-                Transaction.raw_data["symbol"].as_string() == symbol,
+            text(
+                f"INSERT INTO transactions ({_TRANSACTION_COLUMN_LIST}) "
+                f"SELECT {_TRANSACTION_SELECT_LIST} FROM _stage_trades "
+                "ON CONFLICT (binance_id) DO NOTHING"
             )
         )
-        last = result.scalar_one_or_none()
-        return int(last) + 1 if last else None
+        await self.db.execute(text("DROP TABLE _stage_trades"))
+        return result.rowcount or 0
 
-    async def _get_first_trade_datetime(self, symbol: str) -> datetime | None:
+    async def _load_trade_cursors(
+        self, symbols: list[str]
+    ) -> dict[str, tuple[int | None, datetime | None]]:
         """
-        Devuelve el datetime del trade más antiguo del par, o None.
-        Se usa para detectar si falta historial anterior a _HISTORY_START_MS.
+        Cursores de sync incremental de todos los pares en una sola consulta:
+        symbol → (siguiente fromId, datetime del trade más antiguo).
+        Los pares sin trades guardados devuelven (None, None).
+        Usa el par completo (columna generada `symbol`, desde raw_data),
+        no el base_asset parseado, para evitar colisiones entre pares.
+        binance_id es VARCHAR: se ordena como BIGINT porque el máximo
+        lexicográfico ("999" > "1000") haría retroceder el cursor y
+        re-descargar historial ya guardado en cada sync.
+        Cada extremo es un ORDER BY ... LIMIT 1 por par (LATERAL) en vez de
+        MAX/MIN agrupados: PostgreSQL baja por ix_transactions_trade_cursor y
+        ix_transactions_trade_first y se detiene en la primera entrada.
         """
         result = await self.db.execute(
-            select(func.min(Transaction.executed_at)).where(
-                Transaction.account_id == self.account.id,
-                Transaction.type.in_(["buy", "sell"]),
-                Transaction.raw_data["symbol"].as_string() == symbol,
-            )
+            text("""
+                SELECT s.symbol, newest.id, oldest.executed_at
+                FROM unnest(CAST(:symbols AS text[])) AS s(symbol)
+                LEFT JOIN LATERAL (
+                    SELECT t.binance_id::bigint AS id
+                    FROM transactions t
+                    WHERE t.account_id = :account_id
+                      AND t.symbol = s.symbol
+                      AND t.type IN ('buy', 'sell')
+                    ORDER BY t.binance_id::bigint DESC
+                    LIMIT 1
+                ) newest ON true
+                LEFT JOIN LATERAL (
+                    SELECT t.executed_at
+                    FROM transactions t
+                    WHERE t.account_id = :account_id
+                      AND t.symbol = s.symbol
+                      AND t.type IN ('buy', 'sell')
+                    ORDER BY t.executed_at
+                    LIMIT 1
+                ) oldest ON true
+            """),
+            {"symbols": symbols, "account_id": self.account.id},
+        )
+        return {
+            symbol: ((int(last) + 1 if last is not None else None), first_dt)
+            for symbol, last, first_dt in result
+        }
+
+    # Sufijos de cotización conocidos, del más largo al más corto: un sufijo
+    # que contiene a otro (FDUSD/BUSD/USDT frente a USD) se prueba antes
+    _QUOTE_ASSETS: tuple[str, ...] = tuple(
+        sorted(
+            ("USDT", "BUSD", "FDUSD", "BTC", "ETH", "BNB", "EUR", "USD"),
+            key=len,
+            reverse=True,
         )
-        return result.scalar_one_or_none()
+    )
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def _parse_symbol(symbol: str) -> tuple[str, str]:
         """
         Parsea un par de Binance en (base_asset, quote_asset).
         e.g. BTCUSDT → ("BTC", "USDT"), ETHBTC → ("ETH", "BTC")
         La API /api/v3/myTrades no devuelve baseAsset/quoteAsset en el payload.
+        Memoizado: solo hay unos pocos pares distintos por cuenta.
         """
-        for quote in ("USDT", "BUSD", "FDUSD", "BTC", "ETH", "BNB", "EUR", "USD"):
+        for quote in SyncService._QUOTE_ASSETS:
             if symbol.endswith(quote) and len(symbol) > len(quote):
                 return symbol[: -len(quote)], quote
         return symbol, "USDT"
 
-    # Pares cuya moneda de cotización ya es USD o equivalente
-    _USD_QUOTE_ASSETS: frozenset[str] = frozenset({"USDT", "BUSD", "FDUSD", "USD"})
-
-    def _map_trade(self, raw: dict, symbol: str) -> dict:
-        """Convierte un trade de la API al formato de la tabla transactions."""
-        qty = Decimal(raw["qty"])
-        price = Decimal(raw["price"])
-        is_buy = raw["isBuyer"]
-
+    def _map_trades(self, batch: Iterable[dict], symbol: str) -> Iterator[dict]:
+        """
+        Convierte trades de la API al formato de la tabla transactions.
+        Todo lo que depende solo del par (base/quote, la cuenta) se calcula una
+        vez por lote, no por fila: myTrades se pide por símbolo y todas las
+        filas del lote pertenecen a ese par.
+        """
         # Binance /api/v3/myTrades no incluye baseAsset/quoteAsset — parsear del symbol
-        sym = raw.get("symbol", symbol)
-        base_asset, quote_asset = self._parse_symbol(sym)
-
-        # Para pares USD/stablecoin, total_value_usd es inmediato (price ya en USD).
-        # Para pares EUR, se rellena en _enrich_trade_usd_values() usando EURUSDT histórico.
-        if quote_asset in self._USD_QUOTE_ASSETS:
-            total_value_usd = (price * qty).quantize(Decimal("0.00000001"))
-        else:
-            total_value_usd = None
-
-        return {
-            "id": uuid.uuid4(),
-            "account_id": self.account.id,
-            "binance_id": str(raw["id"]),
-            "type": "buy" if is_buy else "sell",
-            "base_asset": base_asset,
-            "quote_asset": quote_asset,
-            "quantity": qty,
-            "price": price,
-            "total_value_usd": total_value_usd,
-            "fee_asset": raw.get("commissionAsset"),
-            "fee_amount": Decimal(raw["commission"]) if raw.get("commission") else None,
-            "executed_at": datetime.fromtimestamp(raw["time"] / 1000, tz=timezone.utc),
-            "raw_data": raw,
-        }
+        base_asset, quote_asset = self._parse_symbol(symbol)
+        # total_value_usd (pares USD y EUR) lo calcula en SQL _enrich_trade_usd_values()
+        account_id = self.account.id
+
+        for raw in batch:
+            commission = raw.get("commission")
+            yield {
+                "account_id": account_id,
+                "binance_id": str(raw["id"]),
+                "type": "buy" if raw["isBuyer"] else "sell",
+                "base_asset": base_asset,
+                "quote_asset": quote_asset,
+                "quantity": raw["qty"],
+                "price": raw["price"],
+                "fee_asset": raw.get("commissionAsset"),
+                "fee_amount": commission or None,
+                "executed_at": raw["time"],
+                "raw_data": raw,
+            }
 
     # -----------------------------------------------------------------------
     # Depósitos de cripto
@@ -339,32 +665,33 @@ class SyncService:
     async def _sync_deposits(self) -> None:
         """Sync de depósitos desde _HISTORY_START_MS. ON CONFLICT DO NOTHING garantiza idempotencia."""
         total = 0
+        buffer: list[dict] = []
 
+        # Un único recorrido sin `coin`: filtrar en servidor costaría un
+        # recorrido de ventanas por moneda seguida (×len(_TRACKED_ASSETS) en
+        # peso de rate limit) para ahorrar unas pocas filas de otras monedas.
         async for batch in self._client.get_all_deposits(since_ms=self._HISTORY_START_MS):
-            rows = [
-                self._map_deposit(d) for d in batch
-                if d.get("coin") in self._TRACKED_ASSETS
-            ]
-            total += await self._upsert_transactions(rows)
+            total += await self._buffer_transactions(
+                buffer,
+                (self._map_deposit(d) for d in batch if d.get("coin") in self._TRACKED_ASSETS),
+            )
 
-        await self.db.commit()
+        total += await self._flush_transactions(buffer)
         self.stats.deposits_saved += total
         logger.info("sync.deposits_done", count=total)
 
     def _map_deposit(self, raw: dict) -> dict:
         return {
-            "id": uuid.uuid4(),
             "account_id": self.account.id,
             "binance_id": raw.get("id") or raw.get("txId", str(uuid.uuid4())),
             "type": "deposit",
             "base_asset": raw["coin"],
             "quote_asset": None,
-            "quantity": Decimal(str(raw["amount"])),
+            "quantity": _numeric_text(raw["amount"]),
             "price": None,
-            "total_value_usd": None,
             "fee_asset": None,
             "fee_amount": None,
-            "executed_at": datetime.fromtimestamp(raw["insertTime"] / 1000, tz=timezone.utc),
+            "executed_at": raw["insertTime"],
             "raw_data": raw,
         }
 
@@ -375,32 +702,32 @@ class SyncService:
     async def _sync_withdrawals(self) -> None:
         """Sync de retiros desde _HISTORY_START_MS. ON CONFLICT DO NOTHING garantiza idempotencia."""
         total = 0
+        buffer: list[dict] = []
 
+        # Sin fan-out por `coin`, igual que en _sync_deposits: withdraw/history
+        # tiene además un peso por UID muy alto, multiplicarlo por moneda no compensa
         async for batch in self._client.get_all_withdrawals(since_ms=self._HISTORY_START_MS):
-            rows = [
-                self._map_withdrawal(w) for w in batch
-                if w.get("coin") in self._TRACKED_ASSETS
-            ]
-            total += await self._upsert_transactions(rows)
+            total += await self._buffer_transactions(
+                buffer,
+                (self._map_withdrawal(w) for w in batch if w.get("coin") in self._TRACKED_ASSETS),
+            )
 
-        await self.db.commit()
+        total += await self._flush_transactions(buffer)
         self.stats.withdrawals_saved += total
         logger.info("sync.withdrawals_done", count=total)
 
     def _map_withdrawal(self, raw: dict) -> dict:
         return {
-            "id": uuid.uuid4(),
             "account_id": self.account.id,
             "binance_id": raw.get("id", str(uuid.uuid4())),
             "type": "withdrawal",
             "base_asset": raw["coin"],
             "quote_asset": None,
-            "quantity": Decimal(str(raw["amount"])),
+            "quantity": _numeric_text(raw["amount"]),
             "price": None,
-            "total_value_usd": None,
             "fee_asset": raw["coin"],
-            "fee_amount": Decimal(str(raw.get("transactionFee", "0"))),
-            "executed_at": datetime.fromisoformat(raw["applyTime"].replace("Z", "+00:00")),
+            "fee_amount": _numeric_text(raw.get("transactionFee", "0")),
+            "executed_at": _iso_to_ms(raw["applyTime"]),
             "raw_data": raw,
         }
 
@@ -418,13 +745,15 @@ class SyncService:
         """
         tx_type = "deposit" if transaction_type == 0 else "withdrawal"
         total = 0
+        buffer: list[dict] = []
 
         try:
             async for batch in self._client.get_all_fiat_orders(
                 transaction_type, since_ms=self._HISTORY_START_MS
             ):
-                rows = [self._map_fiat_order(item, tx_type) for item in batch]
-                total += await self._upsert_transactions(rows)
+                total += await self._buffer_transactions(
+                    buffer, (self._map_fiat_order(item, tx_type) for item in batch)
+                )
         except BinanceAPIError as exc:
             # -2015 = API-key sin permiso fiat; -1002 = no autorizado
             if exc.code in (-2015, -1002, -2014):
@@ -440,28 +769,26 @@ class SyncService:
                 return
             raise
 
-        await self.db.commit()
+        total += await self._flush_transactions(buffer)
         self.stats.fiat_orders_saved += total
         logger.info("sync.fiat_done", transaction_type=transaction_type, count=total)
 
     def _map_fiat_order(self, raw: dict, tx_type: str) -> dict:
         return {
-            "id": uuid.uuid4(),
             "account_id": self.account.id,
             "binance_id": raw.get("orderNo", str(uuid.uuid4())),
             "type": tx_type,
             "base_asset": raw.get("fiatCurrency", "EUR"),
             "quote_asset": None,
-            "quantity": Decimal(str(raw.get("amount", "0"))),
+            "quantity": _numeric_text(raw.get("amount", "0")),
             "price": None,
-            "total_value_usd": None,
             "fee_asset": raw.get("fiatCurrency"),
-            "fee_amount": Decimal(str(raw.get("totalFee", "0"))),
+            "fee_amount": _numeric_text(raw.get("totalFee", "0")),
             # createTime puede ser epoch-ms (int) o string ISO según el endpoint
             "executed_at": (
-                datetime.fromtimestamp(raw["createTime"] / 1000, tz=timezone.utc)
+                int(raw["createTime"])
                 if isinstance(raw["createTime"], (int, float))
-                else datetime.fromisoformat(str(raw["createTime"]).replace("Z", "+00:00"))
+                else _iso_to_ms(str(raw["createTime"]))
             ),
             "raw_data": raw,
         }
@@ -476,37 +803,27 @@ class SyncService:
         paginando en lotes de 1000. ON CONFLICT DO NOTHING garantiza idempotencia.
         Cubre el historial completo necesario para enriquecer trades EUR históricos.
         """
-        from sqlalchemy.dialects.postgresql import insert as pg_insert_ph
-
         price_symbols = ["BTCUSDT", "EURUSDT"]
         total = 0
+        raw_conn = await self._driver_connection()
 
         for sym in price_symbols:
             sym_count = 0
+            # Columnas crudas de la vela (OHLCV llegan como string): PostgreSQL
+            # hace el parseo a NUMERIC, sin Decimal en Python. Se acumulan todas
+            # las páginas del símbolo y se envían en una única sentencia.
+            columns: tuple[list, ...] = ([], [], [], [], [], [])
             try:
                 async for batch in self._client.get_all_klines(
                     sym, "1d", start_time_ms=self._HISTORY_START_MS
                 ):
-                    rows = [
-                        {
-                            "symbol":   sym,
-                            "interval": "1d",
-                            "open_at":  datetime.fromtimestamp(k[0] / 1000, tz=timezone.utc),
-                            "open":     Decimal(str(k[1])),
-                            "high":     Decimal(str(k[2])),
-                            "low":      Decimal(str(k[3])),
-                            "close":    Decimal(str(k[4])),
-                            "volume":   Decimal(str(k[5])),
-                        }
-                        for k in batch
-                    ]
-                    stmt = pg_insert_ph(PriceHistory).values(rows)
-                    stmt = stmt.on_conflict_do_nothing(
-                        index_elements=["symbol", "interval", "open_at"]
-                    )
-                    await self.db.execute(stmt)
-                    await self.db.commit()
-                    sym_count += len(rows)
+                    for col, values in zip(columns, zip(*(k[:6] for k in batch))):
+                        col.extend(values)
+                    sym_count += len(batch)
+                if sym_count:
+                    # SAVEPOINT por símbolo: un fallo no aborta la transacción del paso
+                    async with self.db.begin_nested():
+                        await raw_conn.execute(_UPSERT_PRICES_SQL, sym, "1d", *columns)
             except Exception as exc:
                 logger.warning("sync.prices_symbol_error", symbol=sym, error=str(exc))
                 continue
@@ -522,67 +839,110 @@ class SyncService:
 
     async def _enrich_trade_usd_values(self) -> None:
         """
-        Rellena total_value_usd en transacciones que aún no lo tienen:
+        Rellena total_value_usd en transacciones que aún no lo tienen (los
+        _map_* nunca lo calculan: todo el cálculo es set-based en PostgreSQL):
         - Pares USD/stablecoin: total_value_usd = price * quantity
         - Pares EUR: total_value_usd = price * quantity * EURUSDT_close del día
 
-        Usa un UPDATE bulk para eficiencia. Es idempotente: solo toca filas
-        con total_value_usd IS NULL.
+        Un único UPDATE para ambos casos: las filas pendientes se leen una vez
+        (índice parcial ix_transactions_account_usd_pending) y el tipo de cambio
+        sale de un LEFT JOIN que solo aplica a EUR (factor 1 en pares USD).
+        La vela del día se busca por igualdad en open_at (las velas 1d abren a
+        las 00:00 UTC): búsqueda directa en uq_price_history_symbol_interval_open_at
+        en vez de castear ambos lados a date, que no puede usar índice y además
+        depende de la zona horaria de la sesión.
+        Las filas EUR sin cierre EURUSDT de su día se quedan en NULL.
+        Es idempotente: solo toca filas con total_value_usd IS NULL.
         """
-        from sqlalchemy import text
-
-        # 1. Pares USDT/BUSD/FDUSD/USD — conversión directa
-        await self.db.execute(
-            text("""
-                UPDATE transactions
-                SET total_value_usd = ROUND((price * quantity)::numeric, 8)
-                WHERE account_id  = :account_id
-                  AND total_value_usd IS NULL
-                  AND quote_asset IN ('USDT', 'BUSD', 'FDUSD', 'USD')
-                  AND price IS NOT NULL
-            """),
-            {"account_id": self.account.id},
-        )
-
-        # 2. Pares EUR — multiplicar por tipo de cambio EURUSDT del día
         await self.db.execute(
             text("""
                 UPDATE transactions t
-                SET total_value_usd = ROUND(
-                    (t.price * t.quantity * ph.close)::numeric, 8
-                )
-                FROM price_history ph
-                WHERE t.account_id     = :account_id
-                  AND t.total_value_usd IS NULL
-                  AND t.quote_asset    = 'EUR'
-                  AND t.price          IS NOT NULL
-                  AND ph.symbol        = 'EURUSDT'
-                  AND ph.interval      = '1d'
-                  AND ph.open_at::date = t.executed_at::date
+                SET total_value_usd = ROUND((p.price * p.quantity * p.rate)::numeric, 8)
+                FROM (
+                    SELECT tx.id,
+                           tx.price,
+                           tx.quantity,
+                           CASE WHEN tx.quote_asset = 'EUR' THEN ph.close ELSE 1 END AS rate
+                    FROM transactions tx
+                    LEFT JOIN price_history ph
+                           ON tx.quote_asset    = 'EUR'
+                          AND ph.symbol        = 'EURUSDT'
+                          AND ph.interval      = '1d'
+                          AND ph.open_at       = date_trunc('day', tx.executed_at, 'UTC')
+                    WHERE tx.account_id      = :account_id
+                      AND tx.total_value_usd IS NULL
+                      AND tx.price           IS NOT NULL
+                      AND tx.quote_asset IN ('USDT', 'BUSD', 'FDUSD', 'USD', 'EUR')
+                ) p
+                WHERE t.id = p.id
+                  AND p.rate IS NOT NULL
             """),
             {"account_id": self.account.id},
         )
-
-        await self.db.commit()
         logger.info("sync.enrich_usd_done", account_id=str(self.account.id))
 
     # -----------------------------------------------------------------------
     # Helpers de base de datos
     # -----------------------------------------------------------------------
 
+    # Filas acumuladas por volcado. Con UNNEST cada volcado son 12 parámetros
+    # (arrays) sea cual sea el número de filas: sin límite de 32767 binds.
+    _UPSERT_BATCH_SIZE: int = 10_000
+
+    async def _buffer_transactions(self, buffer: list[dict], rows: Iterable[dict]) -> int:
+        """
+        Acumula filas en buffer y vuelca a BD solo al alcanzar _UPSERT_BATCH_SIZE.
+        Agrupa páginas pequeñas (ventanas de 90 días, páginas fiat) en un único
+        INSERT en lugar de un round-trip por página.
+        `rows` se consume en trozos con islice (suele ser un generador de
+        _map_*): el buffer nunca pasa de _UPSERT_BATCH_SIZE filas aunque la
+        página sea mayor, y no se materializa una lista intermedia por página.
+        Devuelve el número de filas nuevas insertadas en estos volcados (0 si no hubo).
+        """
+        rows = iter(rows)
+        count = 0
+        while True:
+            buffer.extend(islice(rows, self._UPSERT_BATCH_SIZE - len(buffer)))
+            if len(buffer) < self._UPSERT_BATCH_SIZE:
+                return count
+            count += await self._flush_transactions(buffer)
+
+    async def _flush_transactions(self, buffer: list[dict]) -> int:
+        """Vuelca el buffer en una única sentencia y lo vacía para liberar memoria."""
+        count = await self._upsert_transactions(buffer)
+        buffer.clear()
+        return count
+
     async def _upsert_transactions(self, rows: list[dict]) -> int:
         """
         Inserta transacciones ignorando conflictos en binance_id (idempotente).
         Devuelve el número de filas nuevas insertadas.
+        Sin commit: se confirma una sola vez al final del sync (ver sync_all).
+
+        Las filas se trasponen a un array por columna y se envían en una única
+        sentencia preparada (_UPSERT_TRANSACTIONS_SQL) por la conexión asyncpg
+        de la sesión, dentro de su transacción. RETURNING solo devuelve las
+        filas realmente insertadas (ON CONFLICT DO NOTHING): da el recuento.
         """
         if not rows:
             return 0
 
-        stmt = pg_insert(Transaction).values(rows)
-        stmt = stmt.on_conflict_do_nothing(index_elements=["binance_id"])
-        result = await self.db.execute(stmt)
-        await self.db.commit()
-        return result.rowcount or 0
+        arrays = [[row[c] for row in rows] for c in _TRANSACTION_COLUMNS]
+        arrays[-1] = [_json_text(v) for v in arrays[-1]]  # raw_data
+        raw_conn = await self._driver_connection()
+        inserted = await raw_conn.fetch(_UPSERT_TRANSACTIONS_SQL, *arrays)
+        return len(inserted)
+
+    async def _driver_connection(self) -> asyncpg.Connection:
+        """
+        Conexión asyncpg subyacente a la sesión (COPY, arrays). Comparte la
+        transacción abierta por la sesión: el commit sigue siendo self.db.commit().
+        Usarla solo dentro de un begin_nested() (ver _run_step): el adaptador
+        abre la transacción de forma perezosa y sin él cada sentencia del
+        driver se confirmaría por separado.
+        """
+        sa_conn = await self.db.connection()
+        return (await sa_conn.get_raw_connection()).driver_connection
 
     async def _set_status(self, status: str) -> None:
         self.account.sync_status = status
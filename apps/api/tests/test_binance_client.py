@@ -9,10 +9,10 @@ import hashlib
 import hmac
 import json
 import time
-from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
+import orjson
 import pytest
 
 from sync.binance_client import (
@@ -21,6 +21,7 @@ from sync.binance_client import (
     BinanceClient,
     BinanceRateLimitError,
     RateLimitManager,
+    _encode_query,
 )
 
 # ---------------------------------------------------------------------------
@@ -41,6 +42,7 @@ def make_mock_response(
     resp = MagicMock(spec=httpx.Response)
     resp.status_code = status_code
     resp.json.return_value = json_body
+    resp.content = orjson.dumps(json_body)
     resp.headers = httpx.Headers({"X-MBX-USED-WEIGHT-1M": "10", **(headers or {})})
     return resp
 
@@ -62,6 +64,14 @@ def make_client(mock_responses: list) -> tuple[BinanceClient, AsyncMock]:
     return client, mock_http
 
 
+@pytest.fixture
+def noop_sleep(monkeypatch) -> AsyncMock:
+    """asyncio.sleep instantáneo; el mock permite comprobar las esperas de backoff."""
+    sleep = AsyncMock()
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return sleep
+
+
 # ---------------------------------------------------------------------------
 # Tests: firma HMAC
 # ---------------------------------------------------------------------------
@@ -108,6 +118,60 @@ def test_sign_hmac_is_correct():
     assert signed["signature"] == expected_sig
 
 
+def test_signature_matches_hmac_for_long_secret():
+    """Secretos > 64 B se reducen con SHA-256 igual que hmac.new."""
+    secret = "s" * 100
+    client = BinanceClient(API_KEY, secret, base_url=BASE_URL, http_client=AsyncMock())
+    expected = hmac.new(secret.encode(), b"a=1&b=2", hashlib.sha256).hexdigest()
+    assert client._signature("a=1&b=2") == expected
+
+
+def test_encode_query_matches_urlencode():
+    """_encode_query produce lo mismo que urlencode, también con valores a escapar."""
+    from urllib.parse import urlencode
+    for params in (
+        {"symbol": "BTCUSDT", "limit": 1000, "timestamp": 1700000000000},
+        {"coin": "a b"},
+        {"coin": "b&c"},
+        {"coin": "b=c"},
+        {"coin": "ñ"},
+    ):
+        assert _encode_query(params) == urlencode(params)
+
+
+def test_resign_updates_timestamp_and_signature_in_place():
+    """_resign re-firma el mismo dict conservando el orden de claves."""
+    client = BinanceClient(API_KEY, API_SECRET, base_url=BASE_URL, http_client=AsyncMock())
+    signed = client._sign({"symbol": "BTCUSDT", "limit": 1000})
+    signed["timestamp"] -= 60_000
+    client._resign(signed)
+
+    from urllib.parse import urlencode
+    assert list(signed) == ["symbol", "limit", "timestamp", "recvWindow", "signature"]
+    query_string = urlencode({k: v for k, v in signed.items() if k != "signature"})
+    expected_sig = hmac.new(
+        API_SECRET.encode("utf-8"),
+        query_string.encode("utf-8"),
+        hashlib.sha256,
+    ).hexdigest()
+    assert signed["signature"] == expected_sig
+
+
+def test_sign_query_signs_exact_query_string():
+    """_sign_query firma base + parámetros variables tal cual se envían."""
+    client = BinanceClient(API_KEY, API_SECRET, base_url=BASE_URL, http_client=AsyncMock())
+    query = client._sign_query("symbol=BTCUSDT&limit=1000", {"fromId": 5})
+
+    unsigned, signature = query.rsplit("&signature=", 1)
+    assert unsigned.startswith("symbol=BTCUSDT&limit=1000&fromId=5&timestamp=")
+    expected_sig = hmac.new(
+        API_SECRET.encode("utf-8"),
+        unsigned.encode("utf-8"),
+        hashlib.sha256,
+    ).hexdigest()
+    assert signature == expected_sig
+
+
 # ---------------------------------------------------------------------------
 # Tests: RateLimitManager
 # ---------------------------------------------------------------------------
@@ -151,6 +215,46 @@ async def test_rate_limit_check_sleeps_above_threshold(monkeypatch):
     assert sleep_calls[0] > 0
 
 
+async def test_rate_limit_concurrent_checks_pause_once(monkeypatch):
+    """Peticiones concurrentes sobre el umbral comparten una única pausa."""
+    manager = RateLimitManager()
+    manager._used_weight = 1150
+
+    sleep_calls = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds: float) -> None:
+        sleep_calls.append(seconds)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    await asyncio.gather(*(manager.check() for _ in range(5)))
+    assert len(sleep_calls) == 1
+    assert manager._used_weight == 0
+
+
+async def test_get_ticker_price_concurrent_calls_share_one_request():
+    """Llamadas concurrentes al mismo par dentro del TTL hacen una sola petición."""
+    body = {"symbol": "BTCUSDT", "price": "65000.00"}
+    client, mock_http = make_client([make_mock_response(body)])
+
+    results = await asyncio.gather(*(client.get_ticker_price("BTCUSDT") for _ in range(5)))
+    assert all(r == body for r in results)
+    assert await client.get_ticker_price("BTCUSDT") == body
+    assert mock_http.request.call_count == 1
+
+
+async def test_ping_is_unsigned():
+    """ping() va a /api/v3/ping sin firma (peso 1, solo abre la conexión)."""
+    client, mock_http = make_client([make_mock_response({})])
+
+    await client.ping()
+
+    call_args = mock_http.request.call_args
+    assert call_args.args[1].endswith("/api/v3/ping")
+    assert "signature" not in (call_args.kwargs.get("params") or {})
+
+
 # ---------------------------------------------------------------------------
 # Tests: get_account
 # ---------------------------------------------------------------------------
@@ -194,10 +298,8 @@ async def test_get_account_is_signed():
 # ---------------------------------------------------------------------------
 
 
-async def test_request_retries_on_429_then_succeeds(monkeypatch):
+async def test_request_retries_on_429_then_succeeds(noop_sleep):
     """Tras un 429, debe reintentar y tener éxito en el segundo intento."""
-    monkeypatch.setattr(asyncio, "sleep", AsyncMock())
-
     rate_limit_resp = make_mock_response(
         {"code": -1003, "msg": "Too many requests"},
         status_code=429,
@@ -210,12 +312,11 @@ async def test_request_retries_on_429_then_succeeds(monkeypatch):
 
     assert result == {"balances": []}
     assert mock_http.request.call_count == 2
+    noop_sleep.assert_awaited_once_with(1)
 
 
-async def test_request_raises_after_max_retries(monkeypatch):
+async def test_request_raises_after_max_retries(noop_sleep):
     """Tras MAX_RETRIES intentos con 429, debe lanzar BinanceRateLimitError."""
-    monkeypatch.setattr(asyncio, "sleep", AsyncMock())
-
     rate_limit_resp = make_mock_response(
         {"code": -1003, "msg": "Too many requests"},
         status_code=429,
@@ -228,6 +329,8 @@ async def test_request_raises_after_max_retries(monkeypatch):
 
     assert exc_info.value.status_code == 429
     assert mock_http.request.call_count == BinanceClient.MAX_RETRIES
+    # Sin espera tras el último intento
+    assert noop_sleep.await_count == BinanceClient.MAX_RETRIES - 1
 
 
 async def test_request_raises_api_error_on_4xx():
@@ -256,10 +359,8 @@ async def test_request_raises_auth_error_on_401():
         await client.get_account()
 
 
-async def test_request_retries_on_network_error(monkeypatch):
+async def test_request_retries_on_network_error(noop_sleep):
     """Errores de red deben reintentarse con backoff exponencial."""
-    monkeypatch.setattr(asyncio, "sleep", AsyncMock())
-
     success_resp = make_mock_response({"balances": []})
 
     mock_http = AsyncMock(spec=httpx.AsyncClient)
@@ -273,6 +374,7 @@ async def test_request_retries_on_network_error(monkeypatch):
 
     assert result == {"balances": []}
     assert mock_http.request.call_count == 2
+    noop_sleep.assert_awaited_once_with(BinanceClient.BASE_BACKOFF)
 
 
 # ---------------------------------------------------------------------------
@@ -323,6 +425,27 @@ async def test_get_all_trades_stops_when_empty():
     mock_http.request.assert_called_once()
 
 
+async def test_get_all_trades_by_time_stops_at_end_time():
+    """El lote que cruza end_time_ms se recorta y no se piden más páginas."""
+    page = [
+        {"id": i, "symbol": "BTCUSDT", "time": 1700000000000 + i * 1000}
+        for i in range(1000)
+    ]
+    client, mock_http = make_client([make_mock_response(page)])
+    end_ms = 1700000000000 + 499 * 1000
+
+    batches = []
+    async for batch in client.get_all_trades_by_time("BTCUSDT", 0, end_time_ms=end_ms):
+        batches.append(batch)
+
+    assert len(batches) == 1
+    assert batches[0][-1]["time"] == end_ms
+    assert len(batches[0]) == 500
+    mock_http.request.assert_called_once()
+    # Rango > 24 h: endTime no se envía (error -1127 de Binance)
+    assert "endTime" not in mock_http.request.call_args.args[1]
+
+
 # ---------------------------------------------------------------------------
 # Tests: get_deposits (ventanas de 90 días)
 # ---------------------------------------------------------------------------
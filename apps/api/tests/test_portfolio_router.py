@@ -0,0 +1,59 @@
+"""
+Tests del router /api/v1/portfolio.
+Sin base de datos: las dependencias y el servicio se sustituyen por stubs.
+Comprueban el formato en el cable: importes SIEMPRE como string, nunca float.
+"""
+
+import uuid
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.dependencies import get_account, get_db
+from main import app
+from services.portfolio_service import PerformancePoint, PortfolioService
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_db():
+        yield None
+
+    async def fake_history(self, from_date: date, to_date: date) -> list[PerformancePoint]:
+        return [
+            PerformancePoint(
+                snapshot_date=date(2024, 1, 1),
+                total_value_usd=Decimal("0.10000000"),
+                invested_usd=Decimal("100.00"),
+                invested_eur=Decimal("92.59"),
+                pnl_usd=Decimal("-99.90"),
+                pnl_pct=Decimal("-99.90"),
+            )
+        ]
+
+    monkeypatch.setattr(PortfolioService, "calculate_performance_history", fake_history)
+    app.dependency_overrides[get_db] = fake_db
+    app.dependency_overrides[get_account] = lambda: SimpleNamespace(id=uuid.uuid4())
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_get_history_serializes_decimals_as_strings(client):
+    resp = client.get("/api/v1/portfolio/history")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["error"] is None
+    assert body["data"] == [
+        {
+            "date": "2024-01-01",
+            "total_value_usd": "0.10000000",
+            "invested_usd": "100.00",
+            "pnl_usd": "-99.90",
+            "pnl_pct": "-99.90",
+        }
+    ]
+    assert body["meta"]["points"] == 1
@@ -4,17 +4,20 @@ No requieren base de datos.
 Todas las aserciones usan Decimal para evitar errores de precisión.
 """
 
+import uuid
+from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from decimal import Decimal
 
 import pytest
 
+import services.portfolio_service as portfolio_service
 from services.portfolio_service import (
     DCABuyEvent,
     DrawdownResult,
     FIFOLot,
     FIFOResult,
-    PortfolioSnapshot,
+    PortfolioService,
     compute_drawdown,
     compute_fifo,
     compute_vwap,
@@ -26,6 +29,28 @@ from services.portfolio_service import (
 # ---------------------------------------------------------------------------
 
 
+@dataclass(frozen=True, slots=True)
+class _TxStub:
+    """Atributos de Transaction que leen las funciones puras (sin SQLAlchemy)."""
+
+    type: str
+    base_asset: str
+    quantity: Decimal
+    price: Decimal | None
+    executed_at: datetime
+    total_value_usd: Decimal | None
+    quote_asset: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class _SnapStub:
+    """Atributos de PortfolioSnapshot que lee compute_drawdown."""
+
+    snapshot_date: date
+    total_value_usd: Decimal
+    invested_usd: Decimal
+
+
 def make_tx(
     tx_type: str,
     quantity: str,
@@ -33,32 +58,28 @@ def make_tx(
     executed_at: datetime | None = None,
     asset: str = "BTC",
     total_value_usd: str | None = None,
-):
+) -> _TxStub:
     """Crea un objeto Transaction mínimo para tests (no necesita SQLAlchemy)."""
-    from unittest.mock import MagicMock
-
-    tx = MagicMock()
-    tx.type = tx_type
-    tx.base_asset = asset
-    tx.quantity = Decimal(quantity)
-    tx.price = Decimal(price) if price is not None else None
-    tx.executed_at = executed_at or datetime(2024, 1, 1, tzinfo=timezone.utc)
-    tx.total_value_usd = Decimal(total_value_usd) if total_value_usd else None
-    return tx
+    return _TxStub(
+        type=tx_type,
+        base_asset=asset,
+        quantity=Decimal(quantity),
+        price=Decimal(price) if price is not None else None,
+        executed_at=executed_at or datetime(2024, 1, 1, tzinfo=timezone.utc),
+        total_value_usd=Decimal(total_value_usd) if total_value_usd else None,
+    )
 
 
 def make_snapshot(
     snapshot_date: date,
     total_value_usd: str,
     invested_usd: str = "10000",
-):
-    from unittest.mock import MagicMock
-
-    snap = MagicMock(spec=PortfolioSnapshot)
-    snap.snapshot_date = snapshot_date
-    snap.total_value_usd = Decimal(total_value_usd)
-    snap.invested_usd = Decimal(invested_usd)
-    return snap
+) -> _SnapStub:
+    return _SnapStub(
+        snapshot_date=snapshot_date,
+        total_value_usd=Decimal(total_value_usd),
+        invested_usd=Decimal(invested_usd),
+    )
 
 
 # ===========================================================================
@@ -339,3 +360,93 @@ class TestComputeXirr:
         result = compute_xirr(flows)
         assert result is not None
         assert result > Decimal("0")  # rendimiento positivo
+
+
+# ===========================================================================
+# Tests: memo FIFO (PortfolioService._fifo_cached)
+# ===========================================================================
+
+
+class TestFifoCache:
+    EUR_USD = Decimal("1.08")
+
+    @pytest.fixture(autouse=True)
+    def fifo_calls(self, monkeypatch) -> list[int]:
+        """Caché vacía por test; cuenta las llamadas reales a compute_fifo."""
+        calls: list[int] = []
+        real_fifo = portfolio_service.compute_fifo
+
+        def counting_fifo(*args, **kwargs):
+            calls.append(1)
+            return real_fifo(*args, **kwargs)
+
+        monkeypatch.setattr(portfolio_service, "_fifo_cache", portfolio_service.OrderedDict())
+        monkeypatch.setattr(portfolio_service, "compute_fifo", counting_fifo)
+        return calls
+
+    @staticmethod
+    def service() -> PortfolioService:
+        return PortfolioService(db=None, account_id=uuid.UUID(int=1))
+
+    def test_same_rows_hit_cache(self, fifo_calls):
+        svc = self.service()
+        buys = [make_tx("buy", "1.0", "40000")]
+
+        first = svc._fifo_cached("BTC", "metrics", buys, [], self.EUR_USD)
+        second = svc._fifo_cached("BTC", "metrics", buys, [], self.EUR_USD)
+
+        assert second is first
+        assert len(fifo_calls) == 1
+
+    def test_new_transaction_misses_cache(self, fifo_calls):
+        svc = self.service()
+        buys = [make_tx("buy", "1.0", "40000")]
+        svc._fifo_cached("BTC", "metrics", buys, [], self.EUR_USD)
+
+        buys.append(make_tx("buy", "1.0", "50000", datetime(2024, 2, 1, tzinfo=timezone.utc)))
+        result = svc._fifo_cached("BTC", "metrics", buys, [], self.EUR_USD)
+
+        assert result.cost_basis == Decimal("90000")
+        assert len(fifo_calls) == 2
+
+    def test_enriched_usd_value_misses_cache(self, fifo_calls):
+        """Rellenar total_value_usd en filas existentes invalida la entrada."""
+        svc = self.service()
+        svc._fifo_cached("BTC", "metrics", [make_tx("buy", "1.0", "40000")], [], self.EUR_USD)
+
+        enriched = [make_tx("buy", "1.0", "40000", total_value_usd="41000")]
+        result = svc._fifo_cached("BTC", "metrics", enriched, [], self.EUR_USD)
+
+        assert result.cost_basis == Decimal("41000")
+        assert len(fifo_calls) == 2
+
+    def test_entry_expires_after_ttl(self, fifo_calls, monkeypatch):
+        svc = self.service()
+        buys = [make_tx("buy", "1.0", "40000")]
+        now = [1000.0]
+        monkeypatch.setattr(portfolio_service.time, "monotonic", lambda: now[0])
+
+        svc._fifo_cached("BTC", "metrics", buys, [], self.EUR_USD)
+        now[0] += portfolio_service.FIFO_CACHE_TTL_SECONDS - 1
+        svc._fifo_cached("BTC", "metrics", buys, [], self.EUR_USD)
+        assert len(fifo_calls) == 1
+
+        now[0] += 2
+        svc._fifo_cached("BTC", "metrics", buys, [], self.EUR_USD)
+        assert len(fifo_calls) == 2
+
+    def test_full_cache_evicts_least_recently_used(self, fifo_calls, monkeypatch):
+        monkeypatch.setattr(portfolio_service, "FIFO_CACHE_MAX_ENTRIES", 2)
+        svc = self.service()
+        buys = [make_tx("buy", "1.0", "40000")]
+
+        svc._fifo_cached("BTC", "metrics", buys, [], self.EUR_USD)
+        svc._fifo_cached("ETH", "metrics", buys, [], self.EUR_USD)
+        svc._fifo_cached("BTC", "metrics", buys, [], self.EUR_USD)  # BTC pasa a reciente
+        svc._fifo_cached("SOL", "metrics", buys, [], self.EUR_USD)  # expulsa ETH
+        assert len(fifo_calls) == 3
+
+        svc._fifo_cached("BTC", "metrics", buys, [], self.EUR_USD)
+        assert len(fifo_calls) == 3
+        svc._fifo_cached("ETH", "metrics", buys, [], self.EUR_USD)
+        assert len(fifo_calls) == 4
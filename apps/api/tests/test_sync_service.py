@@ -0,0 +1,147 @@
+"""
+Tests de la orquestación de SyncService.
+No requieren base de datos ni red: la sesión es un doble que registra la
+secuencia de transacción (SAVEPOINT, commit) y la API de Binance no se llama.
+"""
+
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from sync.sync_service import SyncService
+
+# ---------------------------------------------------------------------------
+# Helpers de fixtures
+# ---------------------------------------------------------------------------
+
+
+class _FakeNested:
+    """Contexto de begin_nested(): anota si el SAVEPOINT se libera o se deshace."""
+
+    def __init__(self, events: list[str]) -> None:
+        self._events = events
+
+    async def __aenter__(self) -> "_FakeNested":
+        self._events.append("savepoint")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        self._events.append("rollback_savepoint" if exc_type else "release_savepoint")
+        return False
+
+
+class _FakeSession:
+    """AsyncSession mínima: solo lo que usa _sync_trades en modo concurrente."""
+
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    async def __aenter__(self) -> "_FakeSession":
+        return self
+
+    async def __aexit__(self, *_: object) -> bool:
+        self.events.append("close")
+        return False
+
+    def begin_nested(self) -> _FakeNested:
+        return _FakeNested(self.events)
+
+    async def commit(self) -> None:
+        self.events.append("commit")
+
+
+def make_service(monkeypatch, sync_symbol) -> tuple[SyncService, list[_FakeSession]]:
+    """SyncService con session_factory falsa; _sync_symbol_trades lo aporta el test."""
+    sessions: list[_FakeSession] = []
+
+    def session_factory() -> _FakeSession:
+        sessions.append(_FakeSession())
+        return sessions[-1]
+
+    async def fake_cursors(self, symbols):
+        return {symbol: (100, None) for symbol in symbols}
+
+    monkeypatch.setattr(SyncService, "_load_trade_cursors", fake_cursors)
+    monkeypatch.setattr(SyncService, "_sync_symbol_trades", sync_symbol)
+    service = SyncService(
+        db=_FakeSession(),
+        account=SimpleNamespace(id=uuid.uuid4()),
+        api_key="k",
+        api_secret="s",
+        session_factory=session_factory,
+    )
+    return service, sessions
+
+
+# ---------------------------------------------------------------------------
+# Tests: trades concurrentes por símbolo
+# ---------------------------------------------------------------------------
+
+
+async def test_concurrent_symbol_trades_run_in_savepoint_then_commit(monkeypatch):
+    """Las escrituras del par ocurren dentro del SAVEPOINT y se confirman una vez."""
+
+    async def sync_symbol(self, symbol, last_id, first_dt):
+        self.db.events.append("write")
+        return 3
+
+    service, sessions = make_service(monkeypatch, sync_symbol)
+    await service._sync_trades(["BTCUSDT"])
+
+    assert sessions[0].events == ["savepoint", "write", "release_savepoint", "commit", "close"]
+    assert service.stats.trades_saved == 3
+
+
+async def test_concurrent_symbol_trades_roll_back_on_failure(monkeypatch):
+    """Un fallo a mitad de un par deshace sus escrituras: sin commit parcial."""
+
+    async def sync_symbol(self, symbol, last_id, first_dt):
+        self.db.events.append("write")
+        if symbol == "BTCEUR":
+            raise RuntimeError("boom")
+        return 2
+
+    service, sessions = make_service(monkeypatch, sync_symbol)
+    with pytest.raises(RuntimeError, match="boom"):
+        await service._sync_trades(["BTCUSDT", "BTCEUR"])
+
+    ok_session, failed_session = sessions
+    assert ok_session.events[-2:] == ["commit", "close"]
+    assert failed_session.events == ["savepoint", "write", "rollback_savepoint", "close"]
+    assert service.stats.trades_saved == 2
+
+
+# ---------------------------------------------------------------------------
+# Tests: calentamiento de la conexión
+# ---------------------------------------------------------------------------
+
+
+async def test_warm_up_failure_does_not_abort_sync(monkeypatch):
+    """Un ping fallido se registra y el sync sigue: la cuenta termina en idle."""
+
+    async def sync_symbol(self, symbol, last_id, first_dt):
+        return 0
+
+    async def failing_ping():
+        raise httpx.ConnectError("down")
+
+    steps_run: list[str] = []
+
+    async def fake_isolated(self, session_factory, name, step):
+        steps_run.append(name)
+
+    async def noop(self) -> None:
+        return None
+
+    service, _ = make_service(monkeypatch, sync_symbol)
+    monkeypatch.setattr(service._client, "ping", failing_ping)
+    monkeypatch.setattr(SyncService, "_run_step_isolated", fake_isolated)
+    monkeypatch.setattr(SyncService, "_enrich_trade_usd_values", noop)
+
+    stats = await service.sync_all()
+
+    assert service.account.sync_status == "idle"
+    assert stats.errors == []
+    assert "balances" in steps_run